@@ -0,0 +1,195 @@
+#!/usr/bin/env node
+/**
+ * SQLite concurrency benchmark
+ *
+ * Simulates labelers hitting /api/submit (one crop + orientation per transaction)
+ * while an export keeps scanning the whole database, and compares the default
+ * rollback journal against what the server runs (src/lib/server/db.ts).
+ *
+ * Each worker holds its own connection, like one connection from Prisma's pool
+ * per concurrent request. The server enables WAL (stored in the file) and a busy
+ * timeout on every connection, but synchronous=NORMAL reaches only one pooled
+ * connection, so the server profile measures WAL with synchronous=FULL.
+ *
+ * Usage:
+ *   node bench_sqlite.js [--writers 4] [--submissions 500] [--images 2000]
+ */
+
+import Database from 'better-sqlite3';
+import { Worker, isMainThread, parentPort, workerData } from 'worker_threads';
+import { mkdtempSync, readFileSync, readdirSync, rmSync } from 'fs';
+import { cpus, tmpdir } from 'os';
+import { join, dirname } from 'path';
+import { fileURLToPath } from 'url';
+
+const MIGRATIONS_DIR = join(dirname(fileURLToPath(import.meta.url)), 'prisma', 'migrations');
+const BUSY_TIMEOUT_MS = 5000;
+
+const PROFILES = {
+	default: { journal_mode: 'DELETE', synchronous: 'FULL' },
+	server: { journal_mode: 'WAL', synchronous: 'FULL' }
+};
+
+// Prisma's default connection_limit
+const POOL_SIZE = cpus().length * 2 + 1;
+
+function parseArgs() {
+	const args = { writers: 4, submissions: 500, images: 2000 };
+	const argv = process.argv.slice(2);
+	for (let i = 0; i < argv.length; i += 2) {
+		const key = argv[i].replace(/^--/, '');
+		if (key in args) args[key] = parseInt(argv[i + 1]);
+	}
+	return args;
+}
+
+function openDatabase(dbPath, profile) {
+	const db = new Database(dbPath);
+	db.pragma(`journal_mode = ${profile.journal_mode}`);
+	db.pragma(`synchronous = ${profile.synchronous}`);
+	db.pragma(`busy_timeout = ${BUSY_TIMEOUT_MS}`);
+	return db;
+}
+
+function createDatabase(dbPath, profile, imageCount) {
+	const db = openDatabase(dbPath, profile);
+	for (const dir of readdirSync(MIGRATIONS_DIR).sort()) {
+		if (dir.endsWith('.toml')) continue;
+		db.exec(readFileSync(join(MIGRATIONS_DIR, dir, 'migration.sql'), 'utf8'));
+	}
+
+	const insertImage = db.prepare('INSERT INTO images (filename, width, height) VALUES (?, ?, ?)');
+	db.transaction(() => {
+		for (let i = 0; i < imageCount; i++) insertImage.run(`image_${i}.jpg`, 1920, 1080);
+	})();
+	db.close();
+}
+
+function percentile(sorted, p) {
+	if (sorted.length === 0) return 0;
+	return sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))];
+}
+
+// Worker: a labeler submitting crops, or an exporter scanning everything
+function runWorker() {
+	const { dbPath, profile, role, id, submissions, imageCount } = workerData;
+	const db = openDatabase(dbPath, profile);
+
+	if (role === 'reader') {
+		const exportQuery = db.prepare(`
+			SELECT i.id, i.filename, COUNT(c.id) AS crops, AVG(c.x) AS x, AVG(c.y) AS y
+			FROM images i LEFT JOIN crops c ON c.image_id = i.id
+			GROUP BY i.id
+		`);
+		let scans = 0;
+		let stopped = false;
+		parentPort.on('message', () => {
+			stopped = true;
+			db.close();
+			parentPort.postMessage({ scans });
+		});
+		const loop = () => {
+			if (stopped) return;
+			exportQuery.all();
+			scans++;
+			setImmediate(loop);
+		};
+		loop();
+		return;
+	}
+
+	const insertCrop = db.prepare(
+		'INSERT INTO crops (image_id, user_id, x, y, width, height) VALUES (?, ?, ?, ?, ?, ?)'
+	);
+	const insertOrientation = db.prepare(
+		'INSERT INTO orientations (image_id, user_id, orientation) VALUES (?, ?, ?)'
+	);
+	const submit = db.transaction((imageId, userId) => {
+		insertCrop.run(imageId, userId, 100, 120, 800, 900);
+		insertOrientation.run(imageId, userId, 'side');
+	});
+
+	const latencies = [];
+	let busyErrors = 0;
+	for (let i = 0; i < submissions; i++) {
+		const start = process.hrtime.bigint();
+		try {
+			submit(1 + Math.floor(Math.random() * imageCount), `user-${id}`);
+			latencies.push(Number(process.hrtime.bigint() - start) / 1e6);
+		} catch (error) {
+			if (error.code === 'SQLITE_BUSY') busyErrors++;
+			else throw error;
+		}
+	}
+	db.close();
+	parentPort.postMessage({ latencies, busyErrors });
+}
+
+function startWorker(data) {
+	const worker = new Worker(fileURLToPath(import.meta.url), { workerData: data });
+	const result = new Promise((resolve, reject) => {
+		worker.once('message', resolve);
+		worker.once('error', reject);
+	});
+	return { worker, result };
+}
+
+async function runProfile(name, profile, args) {
+	const dir = mkdtempSync(join(tmpdir(), 'cropmymj-bench-'));
+	const dbPath = join(dir, 'bench.db');
+	createDatabase(dbPath, profile, args.images);
+
+	const base = { dbPath, profile, submissions: args.submissions, imageCount: args.images };
+	const reader = startWorker({ ...base, role: 'reader' });
+
+	const start = Date.now();
+	const writers = Array.from({ length: args.writers }, (_, id) =>
+		startWorker({ ...base, role: 'writer', id })
+	);
+	const writerResults = await Promise.all(writers.map((w) => w.result));
+	const elapsed = (Date.now() - start) / 1000;
+
+	reader.worker.postMessage('stop');
+	const { scans } = await reader.result;
+	rmSync(dir, { recursive: true, force: true });
+
+	const latencies = writerResults.flatMap((r) => r.latencies).sort((a, b) => a - b);
+	const busyErrors = writerResults.reduce((sum, r) => sum + r.busyErrors, 0);
+
+	return {
+		profile: name,
+		journal: `${profile.journal_mode}/${profile.synchronous}`,
+		'submits/s': Math.round(latencies.length / elapsed),
+		'p50 ms': percentile(latencies, 0.5).toFixed(2),
+		'p99 ms': percentile(latencies, 0.99).toFixed(2),
+		'busy errors': busyErrors,
+		'export scans': scans
+	};
+}
+
+async function main() {
+	const args = parseArgs();
+	if (args.writers + 1 > POOL_SIZE) {
+		console.warn(
+			`Warning: ${args.writers} writers + 1 reader exceed the server's pool of ${POOL_SIZE} connections; requests beyond that would queue in Prisma instead\n`
+		);
+	}
+	console.log(
+		`Benchmarking ${args.writers} writers x ${args.submissions} submissions against ${args.images} images with a concurrent export reader\n`
+	);
+
+	const results = [];
+	for (const [name, profile] of Object.entries(PROFILES)) {
+		results.push(await runProfile(name, profile, args));
+	}
+	console.table(results);
+}
+
+if (isMainThread) {
+	main().catch((error) => {
+		console.error(error);
+		process.exit(1);
+	});
+} else {
+	runWorker();
+}
@@ -20,69 +20,42 @@ Examples:
     
     # Dry run to see what would be uploaded
     python3 bulk_upload.py /path/to/images --token YOUR_TOKEN --dry-run
+    
+    # Keep near-duplicates (burst shots, re-exports) but group them under the original
+    python3 bulk_upload.py /path/to/images --token YOUR_TOKEN --duplicates group
 """
 
 import os
 import sys
-import base64
-import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
-import requests
 
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print("Warning: PIL not available. Install with: pip install pillow")
-    print("Will use fallback dimensions (1920x1080) for all images.\n")
+from cropmymj import DEFAULT_BASE_URL, CropMyMJClient
+from cropmymj.images import prepare_image_data
+from cropmymj.phash import find_near_duplicates
 
-def encode_image_to_base64(image_path: str) -> str:
-    """Encode image file to base64 string."""
-    with open(image_path, 'rb') as f:
-        return base64.b64encode(f.read()).decode('utf-8')
+UPLOAD_BULK_PATH = '/api/v1/images/upload-bulk'
+# Matches MAX_PHASH_DISTANCE on the server
+MAX_DEDUP_DISTANCE = 8
+# Local in-upload pass when --dedup-distance is not given (the server uses PHASH_DISTANCE)
+DEFAULT_DEDUP_DISTANCE = 5
 
-def get_image_dimensions(image_path: str) -> tuple:
-    """Get image width and height."""
-    if PIL_AVAILABLE:
-        try:
-            with Image.open(image_path) as img:
-                return img.size
-        except Exception as e:
-            print(f"Warning: Could not get dimensions for {image_path}: {e}")
-    return (1920, 1080)  # Fallback
+def prepare_one(task):
+    """Prepare a single image in a worker process; returns (data, error)."""
+    image_path, user_id = task
+    try:
+        return prepare_image_data(image_path, user_id), None
+    except Exception as e:
+        return None, str(e)
 
-def prepare_image_data(image_path: str, user_id: Optional[str] = None) -> Dict:
-    """Prepare image data for upload."""
-    filename = os.path.basename(image_path)
-    width, height = get_image_dimensions(image_path)
-    image_data = encode_image_to_base64(image_path)
-    
-    data = {
-        'filename': filename,
-        'imageData': image_data,
-        'width': width,
-        'height': height
-    }
-    
-    # Add optional metadata if provided
-    if user_id:
-        data['crops'] = []
-        data['orientations'] = []
-    
-    return data
-
-def upload_bulk(api_url, token, images, batch_size=1):
+def upload_bulk(client, images, batch_size=1, **options):
     """Upload images in batches to the bulk upload endpoint."""
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/json'
-    }
+    from requests.exceptions import RequestException
     
     total_successful = 0
     total_skipped = 0
+    total_duplicates = 0
     total_failed = 0
     all_results = []
     
@@ -96,19 +69,31 @@ def upload_bulk(api_url, token, images, batch_size=1):
         
         print(f"📤 Uploading batch {batch_num}/{total_batches} ({len(batch)} images)...", end=' ', flush=True)
         
-        payload = {'images': batch}
-        
         try:
-            response = requests.post(api_url, headers=headers, json=payload, timeout=300)
+            response = client.upload_bulk(batch, **options)
+            
+            if response.status_code == 413 and current_batch_size > 1:
+                # Payload too large - retry with smaller batch
+                new_batch_size = max(1, current_batch_size // 2)
+                print(f"⚠️  Payload too large, retrying with batch size {new_batch_size}")
+                current_batch_size = new_batch_size
+                # Don't increment i - retry same batch with smaller size
+                continue
+            
             response.raise_for_status()
             result = response.json()
             
             total_successful += result.get('successful', 0)
             total_skipped += result.get('skipped', 0)
+            total_duplicates += result.get('duplicates', 0)
             total_failed += result.get('failed', 0)
             all_results.append(result)
             
-            print(f"✅ {result.get('successful', 0)} successful, {result.get('skipped', 0)} skipped, {result.get('failed', 0)} failed")
+            print(f"✅ {result.get('successful', 0)} successful, {result.get('skipped', 0)} skipped, {result.get('duplicates', 0)} near-duplicates, {result.get('failed', 0)} failed")
+            
+            # Print near-duplicates found against images already on the server
+            for dup in result.get('results', {}).get('duplicates', []):
+                print(f"    🔁 {dup['filename']} ≈ {dup['duplicate_of']} (distance {dup['distance']})")
             
             # Print failed uploads
             if result.get('results', {}).get('failed'):
@@ -118,19 +103,7 @@ def upload_bulk(api_url, token, images, batch_size=1):
             # Move to next batch
             i += current_batch_size
             
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 413 and current_batch_size > 1:
-                # Payload too large - retry with smaller batch
-                new_batch_size = max(1, current_batch_size // 2)
-                print(f"⚠️  Payload too large, retrying with batch size {new_batch_size}")
-                current_batch_size = new_batch_size
-                # Don't increment i - retry same batch with smaller size
-            else:
-                print(f"❌ Failed: {e}")
-                total_failed += len(batch)
-                i += current_batch_size
-                    
-        except requests.exceptions.RequestException as e:
+        except RequestException as e:
             print(f"❌ Failed: {e}")
             total_failed += len(batch)
             i += current_batch_size
@@ -138,6 +111,7 @@ def upload_bulk(api_url, token, images, batch_size=1):
     return {
         'total_successful': total_successful,
         'total_skipped': total_skipped,
+        'total_duplicates': total_duplicates,
         'total_failed': total_failed,
         'batches': all_results
     }
@@ -154,8 +128,8 @@ def main():
         '--url',
         '--api-url',
         dest='api_url',
-        default='http://localhost:5174',
-        help='Base URL or full API endpoint (default: http://localhost:5174). Auto-appends /api/v1/images/upload-bulk if not present.'
+        default=DEFAULT_BASE_URL,
+        help=f'Base URL or full API endpoint (default: {DEFAULT_BASE_URL}). Auto-appends /api/v1/images/upload-bulk if not present.'
     )
     parser.add_argument(
         '--token',
@@ -178,6 +152,27 @@ def main():
         '--user-id',
         help='Optional user ID for metadata'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Processes used to read and hash images (default: CPU count)'
+    )
+    parser.add_argument(
+        '--dedup-distance',
+        type=int,
+        default=None,
+        choices=range(-1, MAX_DEDUP_DISTANCE + 1),
+        metavar='{-1..8}',
+        help=f'Max perceptual-hash distance (0-{MAX_DEDUP_DISTANCE} bits of 64) for near-duplicates, -1 disables '
+             f'(default: server PHASH_DISTANCE, {DEFAULT_DEDUP_DISTANCE} for the local pass)'
+    )
+    parser.add_argument(
+        '--duplicates',
+        choices=['skip', 'group'],
+        default='skip',
+        help='Skip near-duplicates, or upload them grouped under the original (default: skip)'
+    )
     parser.add_argument(
         '--dry-run',
         action='store_true',
@@ -186,15 +181,12 @@ def main():
     
     args = parser.parse_args()
     
-    # Auto-construct API URL if just base URL provided
-    api_url = args.api_url
-    if not api_url.endswith('/upload-bulk'):
-        # Remove trailing slash if present
-        api_url = api_url.rstrip('/')
-        # Append the API endpoint
-        api_url = f"{api_url}/api/v1/images/upload-bulk"
+    # Accept either a base URL or the full upload-bulk endpoint
+    base_url = args.api_url.rstrip('/')
+    if base_url.endswith(UPLOAD_BULK_PATH):
+        base_url = base_url[:-len(UPLOAD_BULK_PATH)]
     
-    print(f"🌐 API Endpoint: {api_url}")
+    print(f"🌐 API Endpoint: {base_url}{UPLOAD_BULK_PATH}")
     
     # Validate directory
     directory = Path(args.directory)
@@ -228,18 +220,34 @@ def main():
     images = []
     failed_to_prepare = []
     
-    for idx, img_file in enumerate(image_files, 1):
-        try:
-            img_data = prepare_image_data(str(img_file), args.user_id)
-            images.append(img_data)
+    tasks = [(str(img_file), args.user_id) for img_file in image_files]
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        prepared = executor.map(prepare_one, tasks, chunksize=8)
+        for idx, (img_file, (img_data, error)) in enumerate(zip(image_files, prepared), 1):
+            if error:
+                failed_to_prepare.append((img_file.name, error))
+                print(f"  ❌ {img_file.name}: {error}")
+            else:
+                images.append(img_data)
             if idx % 50 == 0:
                 print(f"  ✓ Prepared {idx}/{len(image_files)} images...")
-        except Exception as e:
-            failed_to_prepare.append((img_file.name, str(e)))
-            print(f"  ❌ {img_file.name}: {e}")
     
     print(f"✅ Prepared {len(images)} images")
     
+    # Drop near-duplicates within this upload before sending them
+    local_duplicates = []
+    local_distance = DEFAULT_DEDUP_DISTANCE if args.dedup_distance is None else args.dedup_distance
+    if local_distance >= 0 and args.duplicates == 'skip':
+        images, local_duplicates = find_near_duplicates(images, local_distance)
+        if local_duplicates:
+            print(f"🔁 Skipping {len(local_duplicates)} near-duplicates within this upload")
+            for filename, original, distance in local_duplicates:
+                print(f"  • {filename} ≈ {original} (distance {distance})")
+    
+    # Local hashes are only for the pass above; the server hashes uploads itself
+    for img in images:
+        img.pop('phash', None)
+    
     if failed_to_prepare:
         print(f"⚠️  Warning: Failed to prepare {len(failed_to_prepare)} images")
     
@@ -249,7 +257,13 @@ def main():
     
     # Upload
     print("─" * 60)
-    result = upload_bulk(api_url, args.token, images, args.batch_size)
+    # Leave duplicateDistance out unless given so the server's PHASH_DISTANCE applies
+    options = {'duplicateAction': args.duplicates}
+    if args.dedup_distance is not None:
+        options['duplicateDistance'] = args.dedup_distance
+    
+    with CropMyMJClient(base_url, token=args.token) as client:
+        result = upload_bulk(client, images, args.batch_size, **options)
     
     # Summary
     print("\n" + "=" * 60)
@@ -258,6 +272,7 @@ def main():
     print(f"Total images processed: {len(images)}")
     print(f"✅ Successful uploads: {result['total_successful']}")
     print(f"⏭️  Skipped (already uploaded): {result['total_skipped']}")
+    print(f"🔁 Near-duplicates: {len(local_duplicates) + result['total_duplicates']}")
     print(f"❌ Failed uploads: {result['total_failed']}")
     
     if failed_to_prepare:
@@ -0,0 +1,19 @@
+"""
+Python client for the CropMyMJ web app API.
+
+Shared by the command line scripts (bulk_upload.py, verify_classifications.py,
+export_classifications.py, fetch_consensus.py, follow_changes.py) and importable
+from any pipeline:
+
+    from cropmymj import CropMyMJClient
+
+    client = CropMyMJClient("http://localhost:5174", token="YOUR_TOKEN")
+    print(client.get_stats())
+
+Heavy dependencies (requests, PIL) are only imported when first used, so
+importing this package and running `--help` or `--dry-run` stays fast.
+"""
+
+from .client import DEFAULT_BASE_URL, CropMyMJClient
+
+__all__ = ['CropMyMJClient', 'DEFAULT_BASE_URL']
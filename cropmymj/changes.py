@@ -0,0 +1,94 @@
+"""
+Resumable consumer for the /api/v1/changes feed.
+
+Events (crop, orientation, unfit, rotation, delete) carry a monotonically
+increasing id. ChangeFeed long-polls for events after its cursor and saves
+the cursor to a file after each batch has been handled, so a restarted
+consumer picks up where it stopped. Delivery is at-least-once: after a crash,
+events from the last unsaved batch are delivered again.
+"""
+
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional
+
+from .client import CropMyMJClient
+
+
+class ChangeFeed:
+    """Iterate over change events, resuming from a cursor file."""
+
+    def __init__(
+        self,
+        client: CropMyMJClient,
+        cursor_path: Optional[str] = None,
+        wait: float = 25,
+        limit: int = 500,
+        retry_delay: float = 5,
+    ):
+        self.client = client
+        self.cursor_path = cursor_path
+        self.wait = wait
+        self.limit = limit
+        self.retry_delay = retry_delay
+        self.cursor = self.load_cursor()
+
+    def load_cursor(self) -> int:
+        """Saved cursor, or 0 (the start of the feed) if there is none."""
+        if self.cursor_path and os.path.exists(self.cursor_path):
+            with open(self.cursor_path) as f:
+                return int(f.read().strip() or 0)
+        return 0
+
+    def save_cursor(self) -> None:
+        """Write the cursor atomically so a crash never leaves a partial file."""
+        if not self.cursor_path:
+            return
+        tmp_path = f"{self.cursor_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(str(self.cursor))
+        os.replace(tmp_path, self.cursor_path)
+
+    def skip_to_latest(self) -> None:
+        """Move the cursor to the newest event, e.g. right after a full sync via list_images()."""
+        self.cursor = self.client.get_changes(limit=0)['cursor']
+        self.save_cursor()
+
+    def poll(self) -> Dict[str, Any]:
+        """One long-poll request after the current cursor."""
+        return self.client.get_changes(self.cursor, wait=self.wait, limit=self.limit)
+
+    def follow(self, stop_when_idle: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Yield events forever (or until the feed is drained with stop_when_idle).
+        The cursor advances past an event only once the caller asks for the next one.
+        """
+        from requests.exceptions import HTTPError, RequestException
+
+        try:
+            while True:
+                try:
+                    batch = self.poll()
+                except RequestException as e:
+                    # A bad token, cursor or parameter won't fix itself: only retry
+                    # connection problems and server errors
+                    if isinstance(e, HTTPError) and e.response is not None and e.response.status_code < 500:
+                        raise
+                    print(f"⚠️  Change feed request failed: {e} (retrying in {self.retry_delay}s)", file=sys.stderr)
+                    time.sleep(self.retry_delay)
+                    continue
+
+                for event in batch['events']:
+                    yield event
+                    self.cursor = event['id']
+                self.save_cursor()
+
+                if stop_when_idle and not batch['has_more']:
+                    return
+        finally:
+            # Also runs when the caller stops iterating early or is interrupted
+            self.save_cursor()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.follow()
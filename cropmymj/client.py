@@ -0,0 +1,162 @@
+"""
+HTTP client for the CropMyMJ API.
+
+One keep-alive requests.Session per client, with retries and exponential
+backoff on connection errors (and on 5xx responses for idempotent methods).
+"""
+
+import os
+from typing import Any, Dict, List, Optional
+
+DEFAULT_BASE_URL = os.environ.get('CROPMYMJ_URL', 'http://localhost:5174')
+
+RETRY_STATUSES = (500, 502, 503, 504)
+# Read and status retries only for idempotent methods. POST still retries
+# connection errors (nothing was sent), but a 500 from upload-bulk is usually
+# a deterministic failure of the whole batch and re-sending it is wasted work.
+RETRY_METHODS = frozenset(['GET', 'HEAD', 'DELETE'])
+
+
+class CropMyMJClient:
+    """Client for the CropMyMJ API sharing a single connection pool."""
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_BASE_URL,
+        token: Optional[str] = None,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        pool_size: int = 10,
+        timeout: float = 30,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.token = token if token is not None else os.environ.get('CROPMYMJ_TOKEN')
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        """requests.Session with a keep-alive pool, created on first use."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            retry = Retry(
+                total=self.retries,
+                connect=self.retries,
+                read=self.retries,
+                status=self.retries,
+                backoff_factor=self.backoff_factor,
+                status_forcelist=RETRY_STATUSES,
+                allowed_methods=RETRY_METHODS,
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(
+                max_retries=retry,
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size,
+            )
+
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            if self.token:
+                session.headers['Authorization'] = f'Bearer {self.token}'
+            self._session = session
+        return self._session
+
+    def close(self):
+        """Close pooled connections."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def request(self, method: str, path: str, **kwargs):
+        """Send a request relative to base_url and return the raw response."""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def _json(self, method: str, path: str, **kwargs) -> Any:
+        response = self.request(method, path, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    # Token-protected v1 API
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Dataset-wide counts from /api/v1/stats."""
+        return self._json('GET', '/api/v1/stats', timeout=10)
+
+    def get_changes(self, cursor: int = 0, wait: float = 0, limit: int = 500) -> Dict[str, Any]:
+        """
+        Change events after cursor from /api/v1/changes. With wait > 0 the server
+        holds the request open for up to that many seconds until something happens.
+        """
+        params = {'cursor': cursor, 'wait': wait, 'limit': limit}
+        return self._json('GET', '/api/v1/changes', params=params, timeout=self.timeout + wait)
+
+    def list_images(self, include_data: bool = False, limit: int = 0, offset: int = 0) -> Dict[str, Any]:
+        """List images, optionally with crops, orientations and consensus."""
+        params: Dict[str, Any] = {}
+        if include_data:
+            params['include_data'] = 'true'
+        if limit > 0:
+            params['limit'] = limit
+            params['offset'] = offset
+        return self._json('GET', '/api/v1/images/list', params=params)
+
+    def get_image_data(self, filename: str) -> Dict[str, Any]:
+        """Crops, orientations, unfits and consensus for one image."""
+        return self._json('GET', '/api/v1/images/data', params={'filename': filename}, timeout=10)
+
+    def get_bulk_data(self, filenames: List[str]) -> Dict[str, Any]:
+        """Consensus data for several images in one request."""
+        return self._json('POST', '/api/v1/images/bulk', json={'filenames': filenames})
+
+    def download_image(self, filename: str) -> bytes:
+        """Original image bytes."""
+        response = self.request('GET', f'/api/v1/images/download/{filename}')
+        response.raise_for_status()
+        return response.content
+
+    def download_cropped(self, filename: str, size: Optional[int] = None) -> bytes:
+        """Consensus-cropped JPEG rendered by the server, optionally fit in size x size."""
+        params = {'size': size} if size else None
+        response = self.request('GET', f'/api/v1/images/cropped/{filename}', params=params)
+        response.raise_for_status()
+        return response.content
+
+    def download_cropped_batch(self, filenames: List[str], fileobj, size: Optional[int] = None,
+                               chunk_size: int = 1 << 20) -> None:
+        """Stream a tar of consensus-cropped JPEGs into a binary file object."""
+        body: Dict[str, Any] = {'filenames': filenames}
+        if size:
+            body['size'] = size
+        with self.request('POST', '/api/v1/images/cropped', json=body, stream=True) as response:
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                fileobj.write(chunk)
+
+    def upload_bulk(self, images: List[Dict[str, Any]], timeout: float = 300, **options):
+        """
+        POST a batch to /api/v1/images/upload-bulk and return the raw response.
+        Extra keyword options (e.g. duplicateDistance, duplicateAction) go in the body.
+        """
+        body: Dict[str, Any] = {'images': images, **options}
+        return self.request('POST', '/api/v1/images/upload-bulk', json=body, timeout=timeout)
+
+    # Session-protected API
+
+    def get_consensus(self, filename: str):
+        """Raw response from /api/consensus (404 when there is no consensus yet)."""
+        return self.request('GET', '/api/consensus', params={'filename': filename}, timeout=10)
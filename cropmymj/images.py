@@ -0,0 +1,89 @@
+"""
+Local image helpers shared by the upload and consensus scripts.
+
+PIL is imported on first use so scripts that never touch pixels don't pay for it.
+"""
+
+import base64
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+FALLBACK_DIMENSIONS = (1920, 1080)
+
+
+@lru_cache(maxsize=None)
+def load_pil():
+    """Return PIL.Image, or None (with a one-time warning) if Pillow is missing."""
+    try:
+        from PIL import Image
+        return Image
+    except ImportError:
+        print("Warning: PIL not available. Install with: pip install pillow")
+        print("Will use fallback dimensions (1920x1080) for all images.\n")
+        return None
+
+
+def encode_image_to_base64(image_path: str) -> str:
+    """Encode image file to base64 string."""
+    with open(image_path, 'rb') as f:
+        return base64.b64encode(f.read()).decode('utf-8')
+
+
+def get_image_dimensions(image_path: str) -> tuple:
+    """Get image width and height."""
+    Image = load_pil()
+    if Image is not None:
+        try:
+            with Image.open(image_path) as img:
+                return img.size
+        except Exception as e:
+            print(f"Warning: Could not get dimensions for {image_path}: {e}")
+    return FALLBACK_DIMENSIONS
+
+
+def prepare_image_data(image_path: str, user_id: Optional[str] = None) -> Dict:
+    """Prepare image data for upload, including its perceptual hash when Pillow is available."""
+    from .phash import dhash
+
+    filename = os.path.basename(image_path)
+    width, height = get_image_dimensions(image_path)
+    image_data = encode_image_to_base64(image_path)
+
+    data = {
+        'filename': filename,
+        'imageData': image_data,
+        'width': width,
+        'height': height
+    }
+
+    try:
+        phash = dhash(image_path)
+    except Exception as e:
+        print(f"Warning: Could not hash {image_path}: {e}")
+        phash = None
+    if phash:
+        data['phash'] = phash
+
+    # Add optional metadata if provided
+    if user_id:
+        data['crops'] = []
+        data['orientations'] = []
+
+    return data
+
+
+def crop_image(image_path: str, output_path: str, crop: Dict) -> None:
+    """Crop an image to {x, y, width, height} and save it."""
+    Image = load_pil()
+    if Image is None:
+        raise RuntimeError("Cropping requires Pillow: pip install pillow")
+
+    with Image.open(image_path) as img:
+        cropped = img.crop((
+            crop['x'],
+            crop['y'],
+            crop['x'] + crop['width'],
+            crop['y'] + crop['height']
+        ))
+        cropped.save(output_path)
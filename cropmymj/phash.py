@@ -0,0 +1,104 @@
+"""
+Perceptual hashing for near-duplicate detection before upload.
+
+dhash() is a 64-bit difference hash as 16 hex chars, following the same steps
+as computePhash() in src/lib/server/phash.ts. Pillow's greyscale conversion and
+resampler differ from sharp's, so these hashes are only compared with each
+other: BKTree drops burst shots and re-exported copies within one upload
+before they are sent, and the server hashes every upload itself.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .images import load_pil
+
+
+def dhash(image_path: str) -> Optional[str]:
+    """64-bit difference hash as 16 hex chars, or None without Pillow."""
+    Image = load_pil()
+    if Image is None:
+        return None
+
+    with Image.open(image_path) as img:
+        small = img.convert('L').resize((9, 8), Image.LANCZOS)
+        pixels = list(small.getdata())
+
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            bits = (bits << 1) | (1 if left > right else 0)
+    return f"{bits:016x}"
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits."""
+    return bin(a ^ b).count('1')
+
+
+class BKTree:
+    """Burkhard-Keller tree over 64-bit hashes for radius queries."""
+
+    def __init__(self):
+        # node: (hash, key, children by distance)
+        self._root: Optional[Tuple[int, str, Dict[int, tuple]]] = None
+        self.size = 0
+
+    def add(self, phash: str, key: str) -> None:
+        value = int(phash, 16)
+        self.size += 1
+        if self._root is None:
+            self._root = (value, key, {})
+            return
+
+        node = self._root
+        while True:
+            distance = hamming(value, node[0])
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = (value, key, {})
+                return
+            node = child
+
+    def nearest(self, phash: str, max_distance: int) -> Optional[Tuple[str, int]]:
+        """Closest (key, distance) within max_distance, or None."""
+        if self._root is None:
+            return None
+
+        value = int(phash, 16)
+        best: Optional[Tuple[str, int]] = None
+        stack = [self._root]
+        while stack:
+            node_value, key, children = stack.pop()
+            distance = hamming(value, node_value)
+            if distance <= max_distance and (best is None or distance < best[1]):
+                best = (key, distance)
+            # Triangle inequality: only subtrees at |d - k| <= max_distance can match
+            for child_distance, child in children.items():
+                if abs(child_distance - distance) <= max_distance:
+                    stack.append(child)
+        return best
+
+
+def find_near_duplicates(images: List[Dict], max_distance: int) -> Tuple[List[Dict], List[Tuple[str, str, int]]]:
+    """
+    Split prepared images into (unique, duplicates) where each duplicate is
+    (filename, original filename, distance). The first image of each group wins.
+    Images without a phash are always kept.
+    """
+    tree = BKTree()
+    unique = []
+    duplicates = []
+    for img in images:
+        phash = img.get('phash')
+        if not phash:
+            unique.append(img)
+            continue
+        match = tree.nearest(phash, max_distance)
+        if match:
+            duplicates.append((img['filename'], match[0], match[1]))
+            continue
+        tree.add(phash, img['filename'])
+        unique.append(img)
+    return unique, duplicates
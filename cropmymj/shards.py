@@ -0,0 +1,173 @@
+"""
+Packed training-shard export of consensus-cropped images.
+
+Writes WebDataset-style tar shards: each sample is a `<key>.jpg` (consensus
+crop, resized) followed by a `<key>.json` (orientation label and source
+metadata). Shards are written by a process pool, one whole shard per task, so
+each file is produced sequentially and dataloaders read large contiguous blocks
+instead of thousands of small JPEGs.
+"""
+
+import io
+import json
+import os
+import tarfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List, Optional
+
+from .client import CropMyMJClient
+
+# Per-process state, set up by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def select_samples(images: List[Dict[str, Any]], include_unfit: bool = False) -> List[Dict[str, Any]]:
+    """Images from /api/v1/images/list?include_data=true that have a consensus crop."""
+    samples = []
+    for img in images:
+        if not img.get('consensusCrop'):
+            continue
+        unfits = len(img.get('unfits') or [])
+        if not include_unfit and unfits >= img.get('submissionCount', 0):
+            continue
+        samples.append(img)
+    return samples
+
+
+def sample_key(img: Dict[str, Any]) -> str:
+    """
+    WebDataset key for an image. Built from the unique image id: keys can't
+    contain dots, and mangling filenames (a.b.jpg vs a_b.jpg) could collide.
+    """
+    return f"image_{img['id']:08d}"
+
+
+def sample_metadata(img: Dict[str, Any]) -> Dict[str, Any]:
+    """Label and source metadata stored next to each cropped image."""
+    return {
+        'image_id': img['id'],
+        'filename': img['filename'],
+        'orientation': img.get('consensusOrientation'),
+        'crop': img['consensusCrop'],
+        'source_width': img['width'],
+        'source_height': img['height'],
+        'rotation': img.get('rotation', 0),
+        'submission_count': img.get('submissionCount', 0),
+        'unfit_count': len(img.get('unfits') or [])
+    }
+
+
+def _init_worker(base_url: str, token: Optional[str], images_dir: Optional[str], size: int, quality: int):
+    # Each process gets its own client (sessions can't be shared across processes)
+    _worker['client'] = CropMyMJClient(base_url, token=token) if not images_dir else None
+    _worker['images_dir'] = images_dir
+    _worker['size'] = size
+    _worker['quality'] = quality
+
+
+def _load_source(filename: str) -> bytes:
+    images_dir = _worker['images_dir']
+    if images_dir:
+        with open(os.path.join(images_dir, filename), 'rb') as f:
+            return f.read()
+    return _worker['client'].download_image(filename)
+
+
+def _render(source: bytes, crop: Dict[str, int]) -> bytes:
+    from PIL import Image
+
+    size = _worker['size']
+    with Image.open(io.BytesIO(source)) as img:
+        cropped = img.convert('RGB').crop((
+            crop['x'],
+            crop['y'],
+            crop['x'] + crop['width'],
+            crop['y'] + crop['height']
+        ))
+    if size > 0:
+        cropped.thumbnail((size, size), Image.LANCZOS)
+
+    out = io.BytesIO()
+    cropped.save(out, format='JPEG', quality=_worker['quality'])
+    return out.getvalue()
+
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes, mtime: float):
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(data))
+
+
+def write_shard(shard_path: str, samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Render and write one shard. Runs inside a pool worker."""
+    written = 0
+    failed = []
+    mtime = time.time()
+    tmp_path = f"{shard_path}.tmp"
+
+    with tarfile.open(tmp_path, 'w') as tar:
+        for img in samples:
+            key = sample_key(img)
+            try:
+                jpeg = _render(_load_source(img['filename']), img['consensusCrop'])
+            except Exception as e:
+                failed.append((img['filename'], str(e)))
+                continue
+            _add_member(tar, f"{key}.jpg", jpeg, mtime)
+            _add_member(tar, f"{key}.json", json.dumps(sample_metadata(img)).encode('utf-8'), mtime)
+            written += 1
+
+    os.replace(tmp_path, shard_path)
+    return {'shard': os.path.basename(shard_path), 'samples': written, 'failed': failed}
+
+
+def export_shards(
+    samples: List[Dict[str, Any]],
+    output_dir: str,
+    base_url: str,
+    token: Optional[str] = None,
+    images_dir: Optional[str] = None,
+    shard_size: int = 1000,
+    size: int = 512,
+    quality: int = 90,
+    workers: Optional[int] = None,
+    prefix: str = 'shard'
+) -> Dict[str, Any]:
+    """
+    Write samples into `<prefix>-000000.tar`, `<prefix>-000001.tar`, ... plus a
+    manifest.json, using a pool of worker processes (one shard per task).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = [samples[i:i + shard_size] for i in range(0, len(samples), shard_size)]
+
+    results = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(base_url, token, images_dir, size, quality)
+    ) as pool:
+        futures = {
+            pool.submit(write_shard, os.path.join(output_dir, f"{prefix}-{index:06d}.tar"), chunk): index
+            for index, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  ✓ {result['shard']}: {result['samples']} samples, {len(result['failed'])} failed")
+
+    results.sort(key=lambda r: r['shard'])
+    manifest = {
+        'format': 'webdataset',
+        'image_size': size,
+        'shards': [{'name': r['shard'], 'samples': r['samples']} for r in results],
+        'total_samples': sum(r['samples'] for r in results)
+    }
+    with open(os.path.join(output_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    return {
+        'manifest': manifest,
+        'failed': [fail for r in results for fail in r['failed']]
+    }
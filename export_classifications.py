@@ -6,27 +6,23 @@ This script exports all image data including crops and orientations
 for further analysis or backup.
 """
 
+import os
 import sys
-import requests
 import json
 import csv
 from datetime import datetime
 from pathlib import Path
 
-TOKEN = "w-0er0wetv-rnti0ew-rit-0enwitc0-ewitre0w-rhi"
-BASE_URL = "http://localhost:5174"
+from cropmymj import DEFAULT_BASE_URL, CropMyMJClient
 
-def fetch_all_data():
+TOKEN = os.environ.get('CROPMYMJ_TOKEN', "w-0er0wetv-rnti0ew-rit-0enwitc0-ewitre0w-rhi")
+BASE_URL = DEFAULT_BASE_URL
+
+def fetch_all_data(client):
     """Fetch all images with full classification data"""
     print("📥 Fetching all image data from server...")
     
-    response = requests.get(
-        f"{BASE_URL}/api/v1/images/list?include_data=true",
-        headers={'Authorization': f'Bearer {TOKEN}'},
-        timeout=60
-    )
-    response.raise_for_status()
-    return response.json()
+    return client.list_images(include_data=True)
 
 def export_to_json(data, output_file):
     """Export to JSON format"""
@@ -134,21 +130,24 @@ def export_detailed_csv(data, output_file):
     
     print(f"✅ Exported detailed submission data to {output_file}")
 
-def print_statistics(data):
-    """Print summary statistics"""
-    images = data['images']
-    total = len(images)
+def print_statistics(stats):
+    """Print summary statistics from /api/v1/stats"""
+    total = stats['totalImages']
+    if total == 0:
+        print("⚠️  No images in database")
+        return
     
-    with_crops = sum(1 for img in images if img.get('crops') and len(img['crops']) > 0)
-    with_orientations = sum(1 for img in images if img.get('orientations') and len(img['orientations']) > 0)
-    with_consensus = sum(1 for img in images if img.get('consensusCrop') is not None)
-    with_unfits = sum(1 for img in images if img.get('unfits') and len(img['unfits']) > 0)
+    with_crops = stats['imagesWithCrops']
+    with_orientations = stats['imagesWithOrientations']
+    # A consensus crop exists for every image with at least one crop
+    with_consensus = with_crops
+    with_unfits = stats['imagesWithUnfits']
     
-    total_submissions = sum(img.get('submissionCount', 0) for img in images)
+    total_submissions = stats['totalSubmissions']
     
     # Count orientations
-    front_count = sum(1 for img in images if img.get('consensusOrientation') == 'front')
-    side_count = sum(1 for img in images if img.get('consensusOrientation') == 'side')
+    front_count = stats['consensusOrientations'].get('front', 0)
+    side_count = stats['consensusOrientations'].get('side', 0)
     
     print()
     print("=" * 70)
@@ -182,12 +181,16 @@ def main():
     
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    from requests.exceptions import RequestException
+    
+    client = CropMyMJClient(BASE_URL, token=TOKEN, timeout=60)
+    
     try:
-        # Fetch data
-        data = fetch_all_data()
-        
         # Print statistics
-        print_statistics(data)
+        print_statistics(client.get_stats())
+        
+        # Fetch data
+        data = fetch_all_data(client)
         
         # Export to different formats
         json_file = export_dir / f"classifications_{timestamp}.json"
@@ -207,7 +210,7 @@ def main():
         print(f"   • {csv_detailed_file} (per-submission details)")
         print()
         
-    except requests.exceptions.RequestException as e:
+    except RequestException as e:
         print(f"❌ Failed to fetch data: {e}")
         print()
         print("Make sure the server is running:")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Export consensus-cropped images as packed training shards
+
+Writes WebDataset-style tar shards (<key>.jpg + <key>.json per sample) so
+training dataloaders read large sequential files instead of thousands of
+small JPEGs. Each JSON holds the consensus orientation label and source
+metadata (filename, crop, source size, submission and unfit counts).
+
+Examples:
+    # Download originals from the server
+    python3 export_training_shards.py exports/shards --token YOUR_TOKEN
+
+    # Read originals from a local copy of IMAGES_PATH, 256px, 8 workers
+    python3 export_training_shards.py exports/shards --token YOUR_TOKEN \\
+        --images-dir ./data/images --size 256 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from cropmymj import DEFAULT_BASE_URL, CropMyMJClient
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Export consensus-cropped images into WebDataset-style tar shards'
+    )
+    parser.add_argument('output_dir', help='Directory to write shards and manifest.json into')
+    parser.add_argument('--url', dest='base_url', default=DEFAULT_BASE_URL,
+                        help=f'Server base URL (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--token', default=os.environ.get('CROPMYMJ_TOKEN'),
+                        help='API authentication token (default: $CROPMYMJ_TOKEN)')
+    parser.add_argument('--images-dir',
+                        help='Read originals from this directory instead of downloading them')
+    parser.add_argument('--size', type=int, default=512,
+                        help='Resize crops to fit in SIZExSIZE, 0 keeps full resolution (default: 512)')
+    parser.add_argument('--quality', type=int, default=90, help='JPEG quality (default: 90)')
+    parser.add_argument('--shard-size', type=int, default=1000,
+                        help='Samples per shard (default: 1000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--include-unfit', action='store_true',
+                        help='Keep images with at least as many unfit marks as crops')
+    args = parser.parse_args()
+
+    if not args.token:
+        print("❌ --token or CROPMYMJ_TOKEN is required")
+        sys.exit(1)
+
+    from cropmymj.shards import export_shards, select_samples
+
+    print("📥 Fetching consensus data...")
+    with CropMyMJClient(args.base_url, token=args.token, timeout=120) as client:
+        images = client.list_images(include_data=True)['images']
+
+    samples = select_samples(images, include_unfit=args.include_unfit)
+    print(f"✅ {len(samples)}/{len(images)} images have a usable consensus crop")
+    if not samples:
+        sys.exit(0)
+
+    print(f"📦 Writing shards of {args.shard_size} to {args.output_dir}...")
+    start = time.time()
+    result = export_shards(
+        samples,
+        args.output_dir,
+        base_url=args.base_url,
+        token=args.token,
+        images_dir=args.images_dir,
+        shard_size=args.shard_size,
+        size=args.size,
+        quality=args.quality,
+        workers=args.workers
+    )
+
+    manifest = result['manifest']
+    print()
+    print(f"✅ Wrote {manifest['total_samples']} samples in {len(manifest['shards'])} shards "
+          f"({time.time() - start:.1f}s)")
+    if result['failed']:
+        print(f"⚠️  {len(result['failed'])} images failed:")
+        for filename, error in result['failed'][:20]:
+            print(f"  • {filename}: {error}")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n\n❌ Interrupted by user")
+        sys.exit(1)
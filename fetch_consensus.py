@@ -4,16 +4,18 @@ Python script to fetch consensus crop and orientation data from the SvelteKit we
 Use this in your pose analysis pipeline to get crowd-sourced crop coordinates and orientation.
 """
 
-import requests
 import json
 from typing import Dict, Any, Optional
 
+from cropmymj import CropMyMJClient
+
 
 class CropConsensusAPI:
     """Client for fetching consensus crop data from the web app."""
     
-    def __init__(self, base_url: str = "http://localhost:3000"):
-        self.base_url = base_url.rstrip('/')
+    def __init__(self, base_url: str = "http://localhost:3000", client: Optional[CropMyMJClient] = None):
+        self.client = client or CropMyMJClient(base_url)
+        self.base_url = self.client.base_url
     
     def get_consensus(self, filename: str) -> Optional[Dict[str, Any]]:
         """
@@ -31,10 +33,7 @@ class CropConsensusAPI:
             Returns None if image not found or no consensus available.
         """
         try:
-            response = requests.get(
-                f"{self.base_url}/api/consensus",
-                params={'filename': filename}
-            )
+            response = self.client.get_consensus(filename)
             
             if response.status_code == 200:
                 return response.json()
@@ -60,7 +59,7 @@ class CropConsensusAPI:
             True if successful, False otherwise
         """
         import os
-        from PIL import Image
+        from cropmymj.images import crop_image
         
         filename = os.path.basename(image_path)
         consensus = self.get_consensus(filename)
@@ -72,14 +71,7 @@ class CropConsensusAPI:
         orientation = consensus['consensusOrientation']
         
         try:
-            img = Image.open(image_path)
-            cropped = img.crop((
-                crop['x'],
-                crop['y'],
-                crop['x'] + crop['width'],
-                crop['y'] + crop['height']
-            ))
-            cropped.save(output_path)
+            crop_image(image_path, output_path, crop)
             
             print(f"Cropped {filename} with consensus data:")
             print(f"  Crop: {crop}")
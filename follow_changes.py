@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Follow the change feed and print each event as a JSON line
+
+Long-polls /api/v1/changes, so new crops, orientations, unfit marks,
+rotations and deletes show up within a second of being written. The cursor
+is saved to a file after each batch, so restarting resumes where it stopped.
+
+Examples:
+    # Follow from the saved cursor (or from the start of the feed)
+    python3 follow_changes.py --token YOUR_TOKEN
+
+    # Start from now, skipping history, and pipe into another process
+    python3 follow_changes.py --token YOUR_TOKEN --from-now | my_pipeline
+
+    # Drain everything new since the last run, then exit (e.g. from cron)
+    python3 follow_changes.py --token YOUR_TOKEN --once
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from cropmymj import DEFAULT_BASE_URL, CropMyMJClient
+from cropmymj.changes import ChangeFeed
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Print change feed events (crop, orientation, unfit, rotation, delete) as JSON lines'
+    )
+    parser.add_argument('--url', dest='base_url', default=DEFAULT_BASE_URL,
+                        help=f'Server base URL (default: {DEFAULT_BASE_URL})')
+    parser.add_argument('--token', default=os.environ.get('CROPMYMJ_TOKEN'),
+                        help='API authentication token (default: $CROPMYMJ_TOKEN)')
+    parser.add_argument('--cursor-file', default='.cropmymj_cursor',
+                        help='File that stores the last processed event id (default: .cropmymj_cursor)')
+    parser.add_argument('--from-now', action='store_true',
+                        help='Skip existing history and only print new events')
+    parser.add_argument('--once', action='store_true',
+                        help='Exit once there are no more events instead of waiting')
+    parser.add_argument('--wait', type=float, default=25,
+                        help='Seconds each long-poll request waits for new events (default: 25)')
+    args = parser.parse_args()
+
+    if not args.token:
+        print("❌ --token or CROPMYMJ_TOKEN is required", file=sys.stderr)
+        sys.exit(1)
+
+    from requests.exceptions import HTTPError
+
+    with CropMyMJClient(args.base_url, token=args.token) as client:
+        feed = ChangeFeed(client, cursor_path=args.cursor_file, wait=0 if args.once else args.wait)
+        if args.from_now:
+            feed.skip_to_latest()
+        print(f"📡 Following changes after cursor {feed.cursor}", file=sys.stderr)
+
+        try:
+            for event in feed.follow(stop_when_idle=args.once):
+                print(json.dumps(event), flush=True)
+        except KeyboardInterrupt:
+            pass
+        except HTTPError as e:
+            print(f"❌ Change feed rejected the request: {e}", file=sys.stderr)
+            sys.exit(1)
+
+        print(f"💾 Cursor saved at {feed.cursor}", file=sys.stderr)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+-- CreateTable
+CREATE TABLE "images" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "filename" TEXT NOT NULL,
+    "width" INTEGER NOT NULL,
+    "height" INTEGER NOT NULL,
+    "rotation" INTEGER NOT NULL DEFAULT 0,
+    "created_at" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+-- CreateTable
+CREATE TABLE "crops" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "image_id" INTEGER NOT NULL,
+    "user_id" TEXT NOT NULL,
+    "x" INTEGER NOT NULL,
+    "y" INTEGER NOT NULL,
+    "width" INTEGER NOT NULL,
+    "height" INTEGER NOT NULL,
+    "created_at" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "crops_image_id_fkey" FOREIGN KEY ("image_id") REFERENCES "images" ("id") ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+-- CreateTable
+CREATE TABLE "orientations" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "image_id" INTEGER NOT NULL,
+    "user_id" TEXT NOT NULL,
+    "orientation" TEXT NOT NULL,
+    "created_at" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "orientations_image_id_fkey" FOREIGN KEY ("image_id") REFERENCES "images" ("id") ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+-- CreateTable
+CREATE TABLE "unfits" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "image_id" INTEGER NOT NULL,
+    "user_id" TEXT NOT NULL,
+    "created_at" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT "unfits_image_id_fkey" FOREIGN KEY ("image_id") REFERENCES "images" ("id") ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+-- CreateIndex
+CREATE UNIQUE INDEX "images_filename_key" ON "images"("filename");
+
+-- CreateIndex
+CREATE INDEX "crops_image_id_idx" ON "crops"("image_id");
+
+-- CreateIndex
+CREATE INDEX "orientations_image_id_idx" ON "orientations"("image_id");
+
+-- CreateIndex
+CREATE INDEX "unfits_image_id_idx" ON "unfits"("image_id");
@@ -0,0 +1,8 @@
+-- CreateIndex
+CREATE INDEX "crops_user_id_image_id_idx" ON "crops"("user_id", "image_id");
+
+-- CreateIndex
+CREATE INDEX "orientations_user_id_image_id_idx" ON "orientations"("user_id", "image_id");
+
+-- CreateIndex
+CREATE INDEX "unfits_user_id_image_id_idx" ON "unfits"("user_id", "image_id");
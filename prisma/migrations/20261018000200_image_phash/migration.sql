@@ -0,0 +1,6 @@
+-- AlterTable
+ALTER TABLE "images" ADD COLUMN "phash" TEXT;
+ALTER TABLE "images" ADD COLUMN "duplicate_of" INTEGER;
+
+-- CreateIndex
+CREATE INDEX "images_duplicate_of_idx" ON "images"("duplicate_of");
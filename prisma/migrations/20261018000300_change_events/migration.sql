@@ -0,0 +1,9 @@
+-- CreateTable
+CREATE TABLE "change_events" (
+    "id" INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    "type" TEXT NOT NULL,
+    "image_id" INTEGER NOT NULL,
+    "filename" TEXT NOT NULL,
+    "data" TEXT NOT NULL DEFAULT '{}',
+    "created_at" DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -1,5 +1,6 @@
 import type { Handle } from '@sveltejs/kit';
 import { startNormalizer } from '$lib/server/normalizer';
+import { dbReady } from '$lib/server/db';
 import { env } from '$env/dynamic/private';
 import crypto from 'crypto';
 
@@ -47,6 +48,9 @@ const API_TOKEN_PATHS = ['/api/v1/'];
 export const handle: Handle = async ({ event, resolve }) => {
 	const path = event.url.pathname;
 
+	// Don't serve requests until the SQLite profile (WAL, synchronous) is applied
+	await dbReady;
+
 	// Always allow these paths
 	if (ALWAYS_PUBLIC_PATHS.some((p) => path === p || path.startsWith(p))) {
 		return resolve(event);
@@ -0,0 +1,142 @@
+import type { Prisma } from '@prisma/client';
+import prisma from '$lib/server/db';
+
+export type ChangeType = 'crop' | 'orientation' | 'unfit' | 'rotation' | 'delete';
+
+export interface ChangeInput {
+	type: ChangeType;
+	image_id: number;
+	filename: string;
+	data?: Record<string, unknown>;
+}
+
+type ChangeWriter = Pick<Prisma.TransactionClient, 'changeEvent'>;
+
+export function cropChange(
+	image: { id: number; filename: string },
+	crop: { id: number; user_id: string; x: number; y: number; width: number; height: number }
+): ChangeInput {
+	return {
+		type: 'crop',
+		image_id: image.id,
+		filename: image.filename,
+		data: {
+			crop_id: crop.id,
+			user_id: crop.user_id,
+			x: crop.x,
+			y: crop.y,
+			width: crop.width,
+			height: crop.height
+		}
+	};
+}
+
+export function orientationChange(
+	image: { id: number; filename: string },
+	orientation: { id: number; user_id: string; orientation: string }
+): ChangeInput {
+	return {
+		type: 'orientation',
+		image_id: image.id,
+		filename: image.filename,
+		data: {
+			orientation_id: orientation.id,
+			user_id: orientation.user_id,
+			orientation: orientation.orientation
+		}
+	};
+}
+
+/**
+ * Insert change events. Pass the transaction client so events commit (or roll
+ * back) together with the rows they describe, then call notifyChanges() once
+ * the transaction has committed.
+ *
+ * SQLite allows a single writer at a time, so ids are assigned in commit order
+ * and a reader never sees id N+1 before id N: the id works as a cursor.
+ */
+export async function writeChanges(db: ChangeWriter, changes: ChangeInput[]) {
+	if (changes.length === 0) return;
+	await db.changeEvent.createMany({
+		data: changes.map((change) => ({
+			type: change.type,
+			image_id: change.image_id,
+			filename: change.filename,
+			data: JSON.stringify(change.data ?? {})
+		}))
+	});
+}
+
+const waiters = new Set<() => void>();
+let notifications = 0;
+
+/**
+ * Wake every request waiting in waitForChanges(). Writers in other processes
+ * don't reach this; their events are picked up when the wait times out.
+ */
+export function notifyChanges() {
+	notifications++;
+	for (const wake of [...waiters]) wake();
+}
+
+/**
+ * Current notification count. Read it before querying and pass it to
+ * waitForChanges() so a notification that lands during the query isn't missed.
+ */
+export function changeVersion(): number {
+	return notifications;
+}
+
+/**
+ * Resolve on the next notifyChanges() (immediately if one already happened since
+ * `since`), after timeoutMs, or when the client disconnects
+ */
+export function waitForChanges(
+	timeoutMs: number,
+	signal?: AbortSignal,
+	since?: number
+): Promise<void> {
+	return new Promise((resolve) => {
+		if (signal?.aborted || (since !== undefined && since !== notifications)) return resolve();
+		const done = () => {
+			clearTimeout(timer);
+			waiters.delete(done);
+			signal?.removeEventListener('abort', done);
+			resolve();
+		};
+		const timer = setTimeout(done, timeoutMs);
+		waiters.add(done);
+		signal?.addEventListener('abort', done);
+	});
+}
+
+/**
+ * Events after the cursor, oldest first, with the JSON payload parsed
+ */
+export async function getChanges(cursor: number, limit: number) {
+	const events = await prisma.changeEvent.findMany({
+		where: { id: { gt: cursor } },
+		orderBy: { id: 'asc' },
+		take: limit
+	});
+
+	return events.map((event) => ({
+		id: event.id,
+		type: event.type as ChangeType,
+		image_id: event.image_id,
+		filename: event.filename,
+		data: JSON.parse(event.data) as Record<string, unknown>,
+		created_at: event.created_at
+	}));
+}
+
+/**
+ * Id of the newest event (0 when the feed is empty)
+ */
+export async function getLatestCursor(): Promise<number> {
+	const latest = await prisma.changeEvent.findFirst({
+		orderBy: { id: 'desc' },
+		select: { id: true }
+	});
+	return latest?.id ?? 0;
+}
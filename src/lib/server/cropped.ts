@@ -0,0 +1,215 @@
+import { env } from '$env/dynamic/private';
+import { readFile, stat } from 'fs/promises';
+import { join } from 'path';
+import sharp from 'sharp';
+import prisma from '$lib/server/db';
+
+const IMAGES_PATH = env.IMAGES_PATH || './static/images';
+const CACHE_MAX_BYTES = parseInt(env.CROPPED_CACHE_MB || '256') * 1024 * 1024;
+const JPEG_QUALITY = 90;
+
+export const MIN_SIZE = 16;
+export const MAX_SIZE = 4096;
+
+export interface CroppedRender {
+	buffer: Buffer;
+	etag: string;
+}
+
+interface ConsensusRow {
+	id: number;
+	width: number;
+	height: number;
+	rotation: number;
+	crop_count: bigint | number;
+	avg_x: number | null;
+	avg_y: number | null;
+	avg_width: number | null;
+	avg_height: number | null;
+}
+
+/**
+ * In-memory LRU of rendered crops.
+ *
+ * Keys include the consensus crop, rotation and file mtime, so a render is never
+ * served after the consensus changes. Routes that write submissions also call
+ * invalidateCropped() to release stale renders right away instead of waiting
+ * for them to age out.
+ */
+const cache = new Map<string, { filename: string; buffer: Buffer }>();
+const keysByFilename = new Map<string, Set<string>>();
+let cacheBytes = 0;
+
+function cacheDelete(key: string) {
+	const entry = cache.get(key);
+	if (!entry) return;
+	cache.delete(key);
+	cacheBytes -= entry.buffer.length;
+	keysByFilename.get(entry.filename)?.delete(key);
+}
+
+function cacheGet(key: string): Buffer | undefined {
+	const entry = cache.get(key);
+	if (!entry) return undefined;
+	// Re-insert to mark as most recently used
+	cache.delete(key);
+	cache.set(key, entry);
+	return entry.buffer;
+}
+
+function cacheSet(key: string, filename: string, buffer: Buffer) {
+	if (buffer.length > CACHE_MAX_BYTES) return;
+	cacheDelete(key);
+	cache.set(key, { filename, buffer });
+	cacheBytes += buffer.length;
+	if (!keysByFilename.has(filename)) keysByFilename.set(filename, new Set());
+	keysByFilename.get(filename)!.add(key);
+
+	for (const oldest of cache.keys()) {
+		if (cacheBytes <= CACHE_MAX_BYTES) break;
+		cacheDelete(oldest);
+	}
+}
+
+/**
+ * Drop every cached render of an image (call after its crops or rotation change)
+ */
+export function invalidateCropped(filename: string) {
+	const keys = keysByFilename.get(filename);
+	if (!keys) return;
+	for (const key of [...keys]) cacheDelete(key);
+	keysByFilename.delete(filename);
+}
+
+export function isSafeFilename(filename: string): boolean {
+	return !filename.includes('..') && !filename.includes('/') && !filename.includes('\\');
+}
+
+export interface CroppedSource {
+	filename: string;
+	filePath: string;
+	key: string;
+	etag: string;
+	width: number;
+	height: number;
+	crop: { left: number; top: number; width: number; height: number };
+	size?: number;
+}
+
+/**
+ * Look up the consensus crop of an image and its cache key/ETag without touching
+ * the pixels, so conditional requests can be answered before rendering.
+ * Returns null if the image is unknown or has no crops yet; throws ENOENT if the
+ * file is missing.
+ *
+ * Rotation is already baked into the file by /api/admin/rotate-image (crops are
+ * transformed with it), so it only needs to be part of the cache key here.
+ */
+export async function resolveCropped(
+	filename: string,
+	size?: number
+): Promise<CroppedSource | null> {
+	const [row] = await prisma.$queryRaw<ConsensusRow[]>`
+		SELECT
+			i.id, i.width, i.height, i.rotation,
+			COUNT(c.id) AS crop_count,
+			AVG(c.x) AS avg_x, AVG(c.y) AS avg_y, AVG(c.width) AS avg_width, AVG(c.height) AS avg_height
+		FROM images i
+		LEFT JOIN crops c ON c.image_id = i.id
+		WHERE i.filename = ${filename}
+		GROUP BY i.id
+	`;
+
+	if (!row || Number(row.crop_count) === 0) return null;
+
+	const filePath = join(IMAGES_PATH, filename);
+	const { mtimeMs } = await stat(filePath);
+
+	const crop = {
+		left: Math.round(row.avg_x ?? 0),
+		top: Math.round(row.avg_y ?? 0),
+		width: Math.round(row.avg_width ?? 0),
+		height: Math.round(row.avg_height ?? 0)
+	};
+
+	const key = [
+		filename,
+		row.rotation,
+		Math.floor(mtimeMs),
+		crop.left,
+		crop.top,
+		crop.width,
+		crop.height,
+		size ?? 0
+	].join(':');
+
+	return {
+		filename,
+		filePath,
+		key,
+		etag: `"${Buffer.from(key).toString('base64url')}"`,
+		width: row.width,
+		height: row.height,
+		crop,
+		size
+	};
+}
+
+/**
+ * JPEG for a resolved crop, from the cache or rendered with sharp
+ */
+export async function renderResolved(source: CroppedSource): Promise<Buffer> {
+	const cached = cacheGet(source.key);
+	if (cached) return cached;
+
+	const { crop } = source;
+	const image = await readFile(source.filePath);
+	const metadata = await sharp(image).metadata();
+	const imageWidth = metadata.width || source.width;
+	const imageHeight = metadata.height || source.height;
+
+	// Clamp to the real file bounds so extract() never fails on edge crops
+	const left = Math.min(Math.max(crop.left, 0), imageWidth - 1);
+	const top = Math.min(Math.max(crop.top, 0), imageHeight - 1);
+	const region = {
+		left,
+		top,
+		width: Math.max(1, Math.min(crop.width, imageWidth - left)),
+		height: Math.max(1, Math.min(crop.height, imageHeight - top))
+	};
+
+	let pipeline = sharp(image).extract(region);
+	if (source.size) {
+		pipeline = pipeline.resize(source.size, source.size, {
+			fit: 'inside',
+			withoutEnlargement: true
+		});
+	}
+	const buffer = await pipeline.jpeg({ quality: JPEG_QUALITY, mozjpeg: true }).toBuffer();
+
+	cacheSet(source.key, source.filename, buffer);
+	return buffer;
+}
+
+/**
+ * Render the consensus crop of an image, optionally resized to fit in size x size.
+ * Returns null if the image is unknown or has no crops yet.
+ */
+export async function renderCropped(
+	filename: string,
+	size?: number
+): Promise<CroppedRender | null> {
+	const source = await resolveCropped(filename, size);
+	if (!source) return null;
+	return { buffer: await renderResolved(source), etag: source.etag };
+}
+
+/**
+ * Parse the optional ?size= parameter. Returns undefined when absent and null when invalid.
+ */
+export function parseSize(value: string | null | undefined): number | undefined | null {
+	if (value === null || value === undefined || value === '') return undefined;
+	const size = parseInt(String(value));
+	if (isNaN(size) || size < MIN_SIZE || size > MAX_SIZE) return null;
+	return size;
+}
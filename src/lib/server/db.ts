@@ -16,13 +16,64 @@ console.log('DATABASE_URL from env:', env.DATABASE_URL || process.env.DATABASE_U
 console.log('DATABASE_URL resolved:', databaseUrl);
 console.log('Current working directory:', process.cwd());
 
+// SQLite tuning (seconds to wait on a locked database before failing with SQLITE_BUSY)
+const SQLITE_BUSY_TIMEOUT = parseInt(env.SQLITE_BUSY_TIMEOUT || '5');
+
+/**
+ * Add the busy timeout to the connection string so every pooled connection
+ * gets it, not just the one that runs the startup pragmas. The pool keeps
+ * Prisma's default size so reads (exports, admin, list) don't queue behind
+ * submits for a single connection.
+ */
+function withSqliteParams(url: string | undefined): string | undefined {
+	if (!url || !url.startsWith('file:') || url.includes('socket_timeout=')) return url;
+	const separator = url.includes('?') ? '&' : '?';
+	return `${url}${separator}socket_timeout=${SQLITE_BUSY_TIMEOUT}`;
+}
+
 const prisma = new PrismaClient({
 	log: ['error', 'warn'],
 	datasources: {
 		db: {
-			url: databaseUrl
+			url: withSqliteParams(databaseUrl)
 		}
 	}
 });
 
+/**
+ * Startup performance profile for SQLite:
+ * - WAL lets readers (exports, admin, list) run alongside a writer instead of
+ *   blocking on the database lock.
+ * - busy_timeout makes concurrent writers wait for the lock instead of failing.
+ * - synchronous=NORMAL avoids an fsync per commit and is durable in WAL mode.
+ *
+ * journal_mode is stored in the file, so it covers every connection; busy_timeout
+ * reaches every connection through socket_timeout in the URL. synchronous is
+ * per-connection and Prisma has no per-connection init hook, so only the pooled
+ * connection that runs it uses NORMAL and the others keep the FULL default (slower
+ * commits, same WAL concurrency).
+ * PRAGMAs that return a row must go through $queryRawUnsafe.
+ */
+async function applySqliteProfile() {
+	if (!databaseUrl?.startsWith('file:')) return;
+
+	try {
+		const [mode] = await prisma.$queryRawUnsafe<{ journal_mode: string }[]>(
+			'PRAGMA journal_mode = WAL;'
+		);
+		await prisma.$queryRawUnsafe(`PRAGMA busy_timeout = ${SQLITE_BUSY_TIMEOUT * 1000};`);
+		await prisma.$executeRawUnsafe('PRAGMA synchronous = NORMAL;');
+		console.log(
+			`SQLite profile applied: journal_mode=${mode?.journal_mode}, synchronous=NORMAL, busy_timeout=${SQLITE_BUSY_TIMEOUT}s`
+		);
+	} catch (error) {
+		console.error('Failed to apply SQLite profile:', error);
+	}
+}
+
+/**
+ * Resolves once the startup pragmas have run; awaited by the request hook
+ */
+export const dbReady = applySqliteProfile();
+
 export default prisma;
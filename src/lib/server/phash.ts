@@ -0,0 +1,248 @@
+import { env } from '$env/dynamic/private';
+import { readFile } from 'fs/promises';
+import { join } from 'path';
+import sharp from 'sharp';
+import prisma from '$lib/server/db';
+
+const IMAGES_PATH = env.IMAGES_PATH || './static/images';
+const BACKFILL_CONCURRENCY = 4;
+
+// Largest accepted distance: lookups probe 137 masks per chunk at 8 and stay sub-millisecond
+// at 100k images, but grow to milliseconds at 12 and hundreds of milliseconds at 32
+export const MAX_PHASH_DISTANCE = 8;
+
+const DEFAULT_PHASH_DISTANCE = 5;
+
+/**
+ * PHASH_DISTANCE from the environment, clamped to -1..MAX_PHASH_DISTANCE.
+ * Invalid values fall back to the default so uploads never inherit a bad default.
+ */
+function parsePhashDistance(value: string | undefined): number {
+	if (!value) return DEFAULT_PHASH_DISTANCE;
+	const distance = Number(value);
+	if (!Number.isInteger(distance)) {
+		console.warn(`Invalid PHASH_DISTANCE "${value}", using ${DEFAULT_PHASH_DISTANCE}`);
+		return DEFAULT_PHASH_DISTANCE;
+	}
+	return Math.min(Math.max(distance, -1), MAX_PHASH_DISTANCE);
+}
+
+// Default Hamming distance (out of 64 bits) at which two images count as near-duplicates
+export const PHASH_DISTANCE = parsePhashDistance(env.PHASH_DISTANCE);
+
+const PHASH_PATTERN = /^[0-9a-f]{16}$/;
+const CHUNKS = 4;
+const CHUNK_BITS = 16;
+
+export function isValidPhash(value: unknown): value is string {
+	return typeof value === 'string' && PHASH_PATTERN.test(value);
+}
+
+/**
+ * 64-bit difference hash (dHash) as 16 hex chars: shrink to 9x8 greyscale and
+ * record whether each pixel is brighter than its right-hand neighbour.
+ * cropmymj.phash.dhash follows the same steps with Pillow, but its greyscale
+ * conversion and resampler differ, so its bits are only comparable with other
+ * Pillow hashes. The server never stores client-computed hashes.
+ */
+export async function computePhash(buffer: Buffer): Promise<string> {
+	const { data, info } = await sharp(buffer)
+		.greyscale()
+		.resize(9, 8, { fit: 'fill', kernel: 'lanczos3' })
+		.raw()
+		.toBuffer({ resolveWithObject: true });
+
+	const channels = info.channels;
+	let hash = '';
+	for (let row = 0; row < 8; row++) {
+		let nibble = 0;
+		for (let col = 0; col < 8; col++) {
+			const left = data[(row * 9 + col) * channels];
+			const right = data[(row * 9 + col + 1) * channels];
+			nibble = (nibble << 1) | (left > right ? 1 : 0);
+			if (col % 4 === 3) {
+				hash += nibble.toString(16);
+				nibble = 0;
+			}
+		}
+	}
+	return hash;
+}
+
+function popcount32(value: number): number {
+	value = value - ((value >>> 1) & 0x55555555);
+	value = (value & 0x33333333) + ((value >>> 2) & 0x33333333);
+	return (((value + (value >>> 4)) & 0x0f0f0f0f) * 0x01010101) >>> 24;
+}
+
+interface Entry {
+	id: number;
+	filename: string;
+	hi: number;
+	lo: number;
+	chunks: number[];
+}
+
+function toEntry(id: number, filename: string, phash: string): Entry {
+	return {
+		id,
+		filename,
+		hi: parseInt(phash.slice(0, 8), 16),
+		lo: parseInt(phash.slice(8), 16),
+		chunks: Array.from({ length: CHUNKS }, (_, i) => parseInt(phash.slice(i * 4, i * 4 + 4), 16))
+	};
+}
+
+// All 16-bit masks with at most `radius` bits set, cached per radius
+const maskCache = new Map<number, number[]>();
+
+function masksWithin(radius: number): number[] {
+	const cached = maskCache.get(radius);
+	if (cached) return cached;
+
+	const masks = [0];
+	const extend = (mask: number, start: number, remaining: number) => {
+		for (let bit = start; bit < CHUNK_BITS; bit++) {
+			const next = mask | (1 << bit);
+			masks.push(next);
+			if (remaining > 1) extend(next, bit + 1, remaining - 1);
+		}
+	};
+	if (radius > 0) extend(0, 0, Math.min(radius, CHUNK_BITS));
+
+	maskCache.set(radius, masks);
+	return masks;
+}
+
+/**
+ * Multi-index hash table for Hamming-distance lookups.
+ *
+ * The 64-bit hash is split into 4 chunks of 16 bits, each with its own exact-match
+ * table. If two hashes differ in at most d bits, at least one chunk differs in at
+ * most floor(d / 4) bits (pigeonhole), so a query only probes chunk values within
+ * that radius (1 probe per chunk for d < 4, 17 for d < 8) and verifies the few
+ * candidates with a full popcount. Lookups stay sub-millisecond at 100k+ images.
+ */
+export class HammingIndex {
+	private tables: Map<number, Entry[]>[] = Array.from({ length: CHUNKS }, () => new Map());
+	private entries = new Map<number, Entry>();
+
+	get size() {
+		return this.entries.size;
+	}
+
+	add(id: number, filename: string, phash: string) {
+		this.remove(id);
+		const entry = toEntry(id, filename, phash);
+		this.entries.set(id, entry);
+		entry.chunks.forEach((chunk, i) => {
+			const bucket = this.tables[i].get(chunk);
+			if (bucket) bucket.push(entry);
+			else this.tables[i].set(chunk, [entry]);
+		});
+	}
+
+	remove(id: number) {
+		const entry = this.entries.get(id);
+		if (!entry) return;
+		this.entries.delete(id);
+		entry.chunks.forEach((chunk, i) => {
+			const bucket = this.tables[i].get(chunk)!.filter((e) => e.id !== id);
+			if (bucket.length > 0) this.tables[i].set(chunk, bucket);
+			else this.tables[i].delete(chunk);
+		});
+	}
+
+	/**
+	 * Closest indexed image within maxDistance bits, or null
+	 */
+	nearest(phash: string, maxDistance: number) {
+		const query = toEntry(-1, '', phash);
+		const masks = masksWithin(Math.floor(maxDistance / CHUNKS));
+		const seen = new Set<number>();
+		let best: { id: number; filename: string; distance: number } | null = null;
+
+		for (let i = 0; i < CHUNKS; i++) {
+			for (const mask of masks) {
+				const bucket = this.tables[i].get(query.chunks[i] ^ mask);
+				if (!bucket) continue;
+				for (const entry of bucket) {
+					if (seen.has(entry.id)) continue;
+					seen.add(entry.id);
+					const distance =
+						popcount32((entry.hi ^ query.hi) >>> 0) + popcount32((entry.lo ^ query.lo) >>> 0);
+					if (distance <= maxDistance && (!best || distance < best.distance)) {
+						best = { id: entry.id, filename: entry.filename, distance };
+					}
+				}
+			}
+		}
+		return best;
+	}
+}
+
+let indexPromise: Promise<HammingIndex> | null = null;
+
+/**
+ * Hash images stored before phash existed (or whose hashing failed) from the files
+ * in IMAGES_PATH, adding canonical ones to the index as they complete
+ */
+async function backfillPhashes(index: HammingIndex) {
+	let missing;
+	try {
+		missing = await prisma.image.findMany({
+			where: { phash: null },
+			select: { id: true, filename: true, duplicate_of: true }
+		});
+	} catch (error) {
+		console.error('Perceptual hash backfill failed:', error);
+		return;
+	}
+	if (missing.length === 0) return;
+
+	console.log(`Backfilling perceptual hashes for ${missing.length} images`);
+	let hashed = 0;
+	let failed = 0;
+	for (let i = 0; i < missing.length; i += BACKFILL_CONCURRENCY) {
+		await Promise.all(
+			missing.slice(i, i + BACKFILL_CONCURRENCY).map(async (image) => {
+				try {
+					const phash = await computePhash(await readFile(join(IMAGES_PATH, image.filename)));
+					await prisma.image.update({ where: { id: image.id }, data: { phash } });
+					if (image.duplicate_of === null) index.add(image.id, image.filename, phash);
+					hashed++;
+				} catch (error) {
+					failed++;
+					console.warn(`Could not hash ${image.filename}:`, error);
+				}
+			})
+		);
+	}
+	console.log(`Perceptual hash backfill complete: ${hashed} hashed, ${failed} failed`);
+}
+
+/**
+ * Index of every canonical image (not itself grouped under another), loaded on first use.
+ * Images without a hash yet are hashed from disk in the background.
+ */
+export function getPhashIndex(): Promise<HammingIndex> {
+	if (!indexPromise) {
+		indexPromise = (async () => {
+			const index = new HammingIndex();
+			const images = await prisma.image.findMany({
+				where: { phash: { not: null }, duplicate_of: null },
+				select: { id: true, filename: true, phash: true }
+			});
+			for (const image of images) {
+				if (isValidPhash(image.phash)) index.add(image.id, image.filename, image.phash);
+			}
+			console.log(`Perceptual hash index loaded: ${index.size} images`);
+
+			// Existing images join the index in the background so the first upload isn't held up
+			void backfillPhashes(index);
+			return index;
+		})();
+		indexPromise.catch(() => (indexPromise = null));
+	}
+	return indexPromise;
+}
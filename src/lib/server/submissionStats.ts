@@ -0,0 +1,322 @@
+import { Prisma } from '@prisma/client';
+import prisma from '$lib/server/db';
+
+export interface CropStats {
+	avg_x: number;
+	avg_y: number;
+	avg_width: number;
+	avg_height: number;
+	std_x: number;
+	std_y: number;
+	std_width: number;
+	std_height: number;
+	count: number;
+}
+
+export type SubmissionSort = 'filename' | 'outliers' | 'submissions';
+
+export interface SubmissionReportQuery {
+	threshold: number;
+	page: number;
+	pageSize: number;
+	sort: SubmissionSort;
+	search?: string;
+	outliersOnly?: boolean;
+	imageId?: number;
+}
+
+// Raw row shape of the per-image aggregate query (SQLite returns COUNT as BigInt)
+interface ImageStatsRow {
+	id: number;
+	filename: string;
+	width: number;
+	height: number;
+	rotation: number;
+	crop_count: bigint | number;
+	unfit_count: bigint | number;
+	outlier_count: bigint | number;
+	avg_x: number | null;
+	avg_y: number | null;
+	avg_width: number | null;
+	avg_height: number | null;
+	var_x: number | null;
+	var_y: number | null;
+	var_width: number | null;
+	var_height: number | null;
+	filtered_total: bigint | number;
+}
+
+interface SummaryRow {
+	total_images: bigint | number;
+	processed_images: bigint | number | null;
+	total_submissions: bigint | number | null;
+	total_outliers: bigint | number | null;
+}
+
+const ORDER_BY: Record<SubmissionSort, Prisma.Sql> = {
+	filename: Prisma.sql`i.filename ASC`,
+	outliers: Prisma.sql`outlier_count DESC, i.filename ASC`,
+	submissions: Prisma.sql`crop_count DESC, i.filename ASC`
+};
+
+const CROP_FIELDS = ['x', 'y', 'width', 'height'] as const;
+
+/**
+ * Per-image crop statistics computed in SQLite.
+ *
+ * Variance uses SUM-of-squares (E[x²] - E[x]²) so each image is a single pass
+ * over its crops. Outliers are found by comparing squared deviations against
+ * threshold² * variance, which avoids needing SQRT in SQLite.
+ */
+function statsCte(threshold: number) {
+	const thresholdSquared = threshold * threshold;
+	return Prisma.sql`
+		WITH stats AS (
+			SELECT
+				image_id,
+				COUNT(*) AS n,
+				AVG(x) AS avg_x,
+				AVG(y) AS avg_y,
+				AVG(width) AS avg_width,
+				AVG(height) AS avg_height,
+				SUM(x * x) * 1.0 / COUNT(*) - AVG(x) * AVG(x) AS var_x,
+				SUM(y * y) * 1.0 / COUNT(*) - AVG(y) * AVG(y) AS var_y,
+				SUM(width * width) * 1.0 / COUNT(*) - AVG(width) * AVG(width) AS var_width,
+				SUM(height * height) * 1.0 / COUNT(*) - AVG(height) * AVG(height) AS var_height
+			FROM crops
+			GROUP BY image_id
+		),
+		outliers AS (
+			SELECT c.image_id, COUNT(*) AS n
+			FROM crops c
+			JOIN stats s ON s.image_id = c.image_id
+			WHERE (s.var_x > 0 AND (c.x - s.avg_x) * (c.x - s.avg_x) > ${thresholdSquared} * s.var_x)
+				OR (s.var_y > 0 AND (c.y - s.avg_y) * (c.y - s.avg_y) > ${thresholdSquared} * s.var_y)
+				OR (s.var_width > 0 AND (c.width - s.avg_width) * (c.width - s.avg_width) > ${thresholdSquared} * s.var_width)
+				OR (s.var_height > 0 AND (c.height - s.avg_height) * (c.height - s.avg_height) > ${thresholdSquared} * s.var_height)
+			GROUP BY c.image_id
+		),
+		unfit_counts AS (
+			SELECT image_id, COUNT(*) AS n
+			FROM unfits
+			GROUP BY image_id
+		)
+	`;
+}
+
+function whereClause(query: SubmissionReportQuery) {
+	const conditions: Prisma.Sql[] = [];
+	if (query.imageId !== undefined) conditions.push(Prisma.sql`i.id = ${query.imageId}`);
+	if (query.search) conditions.push(Prisma.sql`i.filename LIKE ${`%${query.search}%`}`);
+	if (query.outliersOnly) conditions.push(Prisma.sql`COALESCE(o.n, 0) > 0`);
+	return conditions.length > 0
+		? Prisma.sql`WHERE ${Prisma.join(conditions, ' AND ')}`
+		: Prisma.empty;
+}
+
+/**
+ * Dataset-wide totals for the dashboard header, independent of paging and filters.
+ */
+export async function getSubmissionSummary(threshold: number) {
+	const [row] = await prisma.$queryRaw<SummaryRow[]>`
+		${statsCte(threshold)}
+		SELECT
+			(SELECT COUNT(*) FROM images) AS total_images,
+			(SELECT COUNT(*) FROM stats) AS processed_images,
+			(SELECT SUM(n) FROM stats) AS total_submissions,
+			(SELECT SUM(n) FROM outliers) AS total_outliers
+	`;
+
+	return {
+		total_images: Number(row.total_images),
+		processed_images: Number(row.processed_images ?? 0),
+		total_submissions: Number(row.total_submissions ?? 0),
+		total_outliers: Number(row.total_outliers ?? 0)
+	};
+}
+
+/**
+ * Number of images matching the report filters
+ */
+async function countFiltered(query: SubmissionReportQuery): Promise<number> {
+	const [row] = await prisma.$queryRaw<{ total: bigint | number }[]>`
+		${statsCte(query.threshold)}
+		SELECT COUNT(*) AS total
+		FROM images i
+		LEFT JOIN stats s ON s.image_id = i.id
+		LEFT JOIN outliers o ON o.image_id = i.id
+		LEFT JOIN unfit_counts u ON u.image_id = i.id
+		${whereClause(query)}
+	`;
+	return Number(row.total);
+}
+
+/**
+ * One page of images with SQL-computed crop stats. Per-crop detail and
+ * orientation counts are only fetched for the images on this page.
+ */
+export async function getSubmissionReport(query: SubmissionReportQuery) {
+	const offset = (query.page - 1) * query.pageSize;
+
+	const rows = await prisma.$queryRaw<ImageStatsRow[]>`
+		${statsCte(query.threshold)}
+		SELECT
+			i.id, i.filename, i.width, i.height, i.rotation,
+			COALESCE(s.n, 0) AS crop_count,
+			COALESCE(u.n, 0) AS unfit_count,
+			COALESCE(o.n, 0) AS outlier_count,
+			s.avg_x, s.avg_y, s.avg_width, s.avg_height,
+			s.var_x, s.var_y, s.var_width, s.var_height,
+			COUNT(*) OVER () AS filtered_total
+		FROM images i
+		LEFT JOIN stats s ON s.image_id = i.id
+		LEFT JOIN outliers o ON o.image_id = i.id
+		LEFT JOIN unfit_counts u ON u.image_id = i.id
+		${whereClause(query)}
+		ORDER BY ${ORDER_BY[query.sort]}
+		LIMIT ${query.pageSize} OFFSET ${offset}
+	`;
+
+	const imageIds = rows.map((row) => row.id);
+	const [crops, orientationGroups] = await Promise.all([
+		prisma.crop.findMany({
+			where: { image_id: { in: imageIds } },
+			select: {
+				id: true,
+				image_id: true,
+				user_id: true,
+				x: true,
+				y: true,
+				width: true,
+				height: true
+			}
+		}),
+		prisma.orientation.groupBy({
+			by: ['image_id', 'orientation'],
+			where: { image_id: { in: imageIds } },
+			_count: { _all: true }
+		})
+	]);
+
+	const cropsByImage = new Map<number, typeof crops>();
+	for (const crop of crops) {
+		const list = cropsByImage.get(crop.image_id) ?? [];
+		list.push(crop);
+		cropsByImage.set(crop.image_id, list);
+	}
+
+	const orientationsByImage = new Map<number, Record<string, number>>();
+	for (const group of orientationGroups) {
+		const counts = orientationsByImage.get(group.image_id) ?? {};
+		counts[group.orientation] = group._count._all;
+		orientationsByImage.set(group.image_id, counts);
+	}
+
+	const images = rows.map((row) => {
+		const cropCount = Number(row.crop_count);
+		const imageCrops = (cropsByImage.get(row.id) ?? []).map(({ image_id, ...crop }) => crop);
+
+		let stats: CropStats | null = null;
+		let outliers: Array<
+			(typeof imageCrops)[number] & { outlier_fields: string[]; deviation_score: number }
+		> = [];
+
+		if (cropCount > 0) {
+			const avg = {
+				x: row.avg_x ?? 0,
+				y: row.avg_y ?? 0,
+				width: row.avg_width ?? 0,
+				height: row.avg_height ?? 0
+			};
+			const variance = {
+				x: Math.max(row.var_x ?? 0, 0),
+				y: Math.max(row.var_y ?? 0, 0),
+				width: Math.max(row.var_width ?? 0, 0),
+				height: Math.max(row.var_height ?? 0, 0)
+			};
+			const sd = {
+				x: Math.sqrt(variance.x),
+				y: Math.sqrt(variance.y),
+				width: Math.sqrt(variance.width),
+				height: Math.sqrt(variance.height)
+			};
+
+			stats = {
+				avg_x: Math.round(avg.x),
+				avg_y: Math.round(avg.y),
+				avg_width: Math.round(avg.width),
+				avg_height: Math.round(avg.height),
+				std_x: Math.round(sd.x),
+				std_y: Math.round(sd.y),
+				std_width: Math.round(sd.width),
+				std_height: Math.round(sd.height),
+				count: cropCount
+			};
+
+			// Same squared comparison as the SQL so the counts agree
+			outliers = imageCrops
+				.map((crop) => {
+					const outlier_fields: string[] = [];
+					let deviationSum = 0;
+					for (const field of CROP_FIELDS) {
+						const diff = crop[field] - avg[field];
+						if (
+							variance[field] > 0 &&
+							diff * diff > query.threshold * query.threshold * variance[field]
+						) {
+							outlier_fields.push(field);
+							deviationSum += Math.abs(diff) / sd[field];
+						}
+					}
+					return {
+						...crop,
+						outlier_fields,
+						deviation_score: Math.round(deviationSum * 100) / 100
+					};
+				})
+				.filter((crop) => crop.outlier_fields.length > 0)
+				.sort((a, b) => b.deviation_score - a.deviation_score);
+		}
+
+		const orientationCounts = orientationsByImage.get(row.id) ?? {};
+		const totalOrientations = Object.values(orientationCounts).reduce((a, b) => a + b, 0);
+		const mostCommonOrientation =
+			totalOrientations > 0
+				? Object.entries(orientationCounts).sort((a, b) => b[1] - a[1])[0]
+				: null;
+
+		return {
+			image_id: row.id,
+			filename: row.filename,
+			width: row.width,
+			height: row.height,
+			rotation: row.rotation || 0,
+			total_submissions: cropCount,
+			total_unfits: Number(row.unfit_count),
+			outlier_count: Number(row.outlier_count),
+			crop_stats: stats,
+			all_crops: imageCrops,
+			outliers,
+			orientations: orientationCounts,
+			most_common_orientation: mostCommonOrientation
+				? {
+						orientation: mostCommonOrientation[0],
+						count: mostCommonOrientation[1],
+						percentage: Math.round((mostCommonOrientation[1] / totalOrientations) * 100)
+					}
+				: null
+		};
+	});
+
+	// The window count only exists when the page has rows; past the last page, count separately
+	const filteredTotal =
+		rows.length > 0 ? Number(rows[0].filtered_total) : offset > 0 ? await countFiltered(query) : 0;
+
+	return {
+		images,
+		total: filteredTotal,
+		page: query.page,
+		page_size: query.pageSize,
+		total_pages: Math.max(1, Math.ceil(filteredTotal / query.pageSize))
+	};
+}
@@ -0,0 +1,55 @@
+/**
+ * Minimal streaming ustar writer (no compression: JPEG data doesn't compress further)
+ */
+
+const BLOCK_SIZE = 512;
+
+function writeString(header: Buffer, value: string, offset: number, length: number) {
+	header.write(value.slice(0, length), offset, length, 'utf8');
+}
+
+function writeOctal(header: Buffer, value: number, offset: number, length: number) {
+	writeString(header, value.toString(8).padStart(length - 1, '0') + '\0', offset, length);
+}
+
+/**
+ * 512-byte header for a regular file entry. Names are limited to 100 bytes.
+ */
+export function tarHeader(name: string, size: number, mtime: Date = new Date()): Buffer {
+	if (Buffer.byteLength(name) > 100) {
+		throw new Error(`Tar entry name too long: ${name}`);
+	}
+
+	const header = Buffer.alloc(BLOCK_SIZE);
+	writeString(header, name, 0, 100);
+	writeOctal(header, 0o644, 100, 8);
+	writeOctal(header, 0, 108, 8);
+	writeOctal(header, 0, 116, 8);
+	writeOctal(header, size, 124, 12);
+	writeOctal(header, Math.floor(mtime.getTime() / 1000), 136, 12);
+	header.fill(' ', 148, 156); // checksum is computed with this field as spaces
+	writeString(header, '0', 156, 1);
+	writeString(header, 'ustar\0', 257, 6);
+	writeString(header, '00', 263, 2);
+
+	let checksum = 0;
+	for (const byte of header) checksum += byte;
+	writeString(header, checksum.toString(8).padStart(6, '0') + '\0 ', 148, 8);
+
+	return header;
+}
+
+/**
+ * Header, data and zero padding for one file entry
+ */
+export function tarEntry(name: string, data: Uint8Array, mtime?: Date): Buffer[] {
+	const padding = (BLOCK_SIZE - (data.length % BLOCK_SIZE)) % BLOCK_SIZE;
+	return [tarHeader(name, data.length, mtime), Buffer.from(data), Buffer.alloc(padding)];
+}
+
+/**
+ * Two empty blocks mark the end of the archive
+ */
+export function tarEnd(): Buffer {
+	return Buffer.alloc(BLOCK_SIZE * 2);
+}
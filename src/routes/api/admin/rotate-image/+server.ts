@@ -1,6 +1,8 @@
 import { json } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
 import prisma from '$lib/server/db';
+import { invalidateCropped } from '$lib/server/cropped';
+import { notifyChanges, writeChanges } from '$lib/server/changes';
 import { readFile, writeFile } from 'fs/promises';
 import { join } from 'path';
 import { env } from '$env/dynamic/private';
@@ -91,28 +93,47 @@ export const POST: RequestHandler = async ({ request }) => {
 			};
 		});
 
-		// Update image dimensions and rotation in database
-		await prisma.image.update({
-			where: { id: image.id },
-			data: {
-				width: newWidth,
-				height: newHeight,
-				rotation: rotation
-			}
-		});
-
-		// Update all crop coordinates
-		for (const crop of updatedCrops) {
-			await prisma.crop.update({
-				where: { id: crop.id },
+		// Update image dimensions, rotation, all crop coordinates and the change event together.
+		// Crop coordinates moved with the pixels, so the event carries the new ones
+		await prisma.$transaction(async (tx) => {
+			await tx.image.update({
+				where: { id: image.id },
 				data: {
-					x: crop.x,
-					y: crop.y,
-					width: crop.width,
-					height: crop.height
+					width: newWidth,
+					height: newHeight,
+					rotation: rotation
 				}
 			});
-		}
+
+			for (const crop of updatedCrops) {
+				await tx.crop.update({
+					where: { id: crop.id },
+					data: {
+						x: crop.x,
+						y: crop.y,
+						width: crop.width,
+						height: crop.height
+					}
+				});
+			}
+
+			await writeChanges(tx, [
+				{
+					type: 'rotation',
+					image_id: image.id,
+					filename,
+					data: {
+						rotation,
+						width: newWidth,
+						height: newHeight,
+						crops: updatedCrops.map(({ id, ...coords }) => ({ crop_id: id, ...coords }))
+					}
+				}
+			]);
+		});
+
+		notifyChanges();
+		invalidateCropped(filename);
 
 		return json({
 			message: 'Image rotated successfully',
@@ -1,6 +1,8 @@
 import { json } from '@sveltejs/kit';
 import prisma from '$lib/server/db';
 import { validateApiToken } from '$lib/server/auth';
+import { invalidateCropped } from '$lib/server/cropped';
+import { notifyChanges, writeChanges } from '$lib/server/changes';
 import type { RequestHandler } from './$types';
 
 // Delete a specific crop submission
@@ -17,10 +19,25 @@ export const DELETE: RequestHandler = async (event) => {
 	}
 
 	try {
-		await prisma.crop.delete({
-			where: { id: cropId }
+		const crop = await prisma.$transaction(async (tx) => {
+			const deleted = await tx.crop.delete({
+				where: { id: cropId },
+				include: { image: { select: { filename: true } } }
+			});
+			await writeChanges(tx, [
+				{
+					type: 'delete',
+					image_id: deleted.image_id,
+					filename: deleted.image.filename,
+					data: { target: 'crop', crop_id: deleted.id, user_id: deleted.user_id }
+				}
+			]);
+			return deleted;
 		});
 
+		notifyChanges();
+		invalidateCropped(crop.image.filename);
+
 		return json({ success: true, message: 'Crop deleted successfully' });
 	} catch (error) {
 		console.error('Error deleting crop:', error);
@@ -1,6 +1,7 @@
 import { json } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
 import prisma from '$lib/server/db';
+import { Prisma } from '@prisma/client';
 import crypto from 'crypto';
 import { env } from '$env/dynamic/private';
 
@@ -18,6 +19,51 @@ function isAuthenticated(cookies: any): boolean {
 	return sessionPassword === hashPassword(SITE_PASSWORD);
 }
 
+interface CandidateRow {
+	filename: string;
+	submission_count: bigint | number;
+}
+
+/**
+ * Canonical images (near-duplicates grouped under another image are not labeled
+ * separately) with their number of distinct submitters, fewest first. With a
+ * userId, images that user already cropped, classified or marked unfit are left
+ * out in SQL using the (user_id, image_id) indexes.
+ */
+async function imagesBySubmissions(userId: string | null) {
+	const notClassifiedBy = userId
+		? Prisma.sql`
+			AND NOT EXISTS (SELECT 1 FROM crops WHERE user_id = ${userId} AND image_id = i.id)
+			AND NOT EXISTS (SELECT 1 FROM orientations WHERE user_id = ${userId} AND image_id = i.id)
+			AND NOT EXISTS (SELECT 1 FROM unfits WHERE user_id = ${userId} AND image_id = i.id)
+		`
+		: Prisma.empty;
+
+	const rows = await prisma.$queryRaw<CandidateRow[]>`
+		WITH submitters AS (
+			SELECT image_id, user_id FROM crops
+			UNION
+			SELECT image_id, user_id FROM orientations
+			UNION
+			SELECT image_id, user_id FROM unfits
+		),
+		counts AS (
+			SELECT image_id, COUNT(*) AS n FROM submitters GROUP BY image_id
+		)
+		SELECT i.filename, COALESCE(c.n, 0) AS submission_count
+		FROM images i
+		LEFT JOIN counts c ON c.image_id = i.id
+		WHERE i.duplicate_of IS NULL
+		${notClassifiedBy}
+		ORDER BY submission_count ASC
+	`;
+
+	return rows.map((row) => ({
+		filename: row.filename,
+		submissionCount: Number(row.submission_count)
+	}));
+}
+
 export const GET: RequestHandler = async ({ url, cookies }) => {
 	// Check authentication
 	if (!isAuthenticated(cookies)) {
@@ -31,70 +77,16 @@ export const GET: RequestHandler = async ({ url, cookies }) => {
 	}
 
 	try {
-		// Get all images with their submission counts and check if user has already classified them
-		const images = await prisma.image.findMany({
-			select: {
-				id: true,
-				filename: true,
-				crops: {
-					select: {
-						user_id: true
-					}
-				},
-				orientations: {
-					select: {
-						user_id: true
-					}
-				},
-				unfits: {
-					select: {
-						user_id: true
-					}
-				}
-			}
-		});
-
-		// Calculate submission counts and filter out images user has already classified
-		const unclassifiedImages = images
-			.map((image) => {
-				// Check if user has submitted anything for this image
-				const userHasClassified =
-					image.crops.some((c) => c.user_id === userId) ||
-					image.orientations.some((o) => o.user_id === userId) ||
-					image.unfits.some((u) => u.user_id === userId);
-
-				// Count total unique users who have submitted for this image
-				const allUserIds = new Set([
-					...image.crops.map((c) => c.user_id),
-					...image.orientations.map((o) => o.user_id),
-					...image.unfits.map((u) => u.user_id)
-				]);
-
-				return {
-					filename: image.filename,
-					submissionCount: allUserIds.size,
-					userHasClassified
-				};
-			})
-			.filter((img) => !img.userHasClassified);
+		// Images this user hasn't submitted anything for, least-classified first
+		const unclassifiedImages = await imagesBySubmissions(userId);
 
 		// If no unclassified images, return all images (user has classified everything)
 		if (unclassifiedImages.length === 0) {
-			// Get all images and sort by submission count
-			const allImages = images.map((image) => {
-				const allUserIds = new Set([
-					...image.crops.map((c) => c.user_id),
-					...image.orientations.map((o) => o.user_id),
-					...image.unfits.map((u) => u.user_id)
-				]);
-
-				return {
-					filename: image.filename,
-					submissionCount: allUserIds.size
-				};
-			});
-
-			allImages.sort((a, b) => a.submissionCount - b.submissionCount);
+			// All images, least-classified first
+			const allImages = await imagesBySubmissions(null);
+			if (allImages.length === 0) {
+				return json({ error: 'No images available' }, { status: 404 });
+			}
 
 			// Return random image from bottom 20% (least classified)
 			const bottomThird = allImages.slice(0, Math.max(1, Math.ceil(allImages.length * 0.2)));
@@ -107,9 +99,7 @@ export const GET: RequestHandler = async ({ url, cookies }) => {
 			});
 		}
 
-		// Sort by submission count (ascending - prioritize images with fewer submissions)
-		unclassifiedImages.sort((a, b) => a.submissionCount - b.submissionCount);
-
+		// Already sorted by submission count (ascending - prioritize images with fewer submissions)
 		// Use weighted random selection favoring images with fewer submissions
 		// Bottom 30% of images get higher weight
 		const thirtyPercent = Math.max(1, Math.ceil(unclassifiedImages.length * 0.3));
@@ -1,5 +1,7 @@
 import { json } from '@sveltejs/kit';
 import prisma from '$lib/server/db';
+import { invalidateCropped } from '$lib/server/cropped';
+import { cropChange, notifyChanges, orientationChange, writeChanges } from '$lib/server/changes';
 import type { RequestHandler } from './$types';
 
 export const POST: RequestHandler = async ({ request }) => {
@@ -22,9 +24,9 @@ export const POST: RequestHandler = async ({ request }) => {
 			create: { filename, width, height }
 		});
 
-		// Create crop and orientation in a transaction
-		await prisma.$transaction([
-			prisma.crop.create({
+		// Create crop, orientation and their change events in a transaction
+		await prisma.$transaction(async (tx) => {
+			const createdCrop = await tx.crop.create({
 				data: {
 					image_id: image.id,
 					user_id: userId,
@@ -33,15 +35,22 @@ export const POST: RequestHandler = async ({ request }) => {
 					width: crop.width,
 					height: crop.height
 				}
-			}),
-			prisma.orientation.create({
+			});
+			const createdOrientation = await tx.orientation.create({
 				data: {
 					image_id: image.id,
 					user_id: userId,
 					orientation
 				}
-			})
-		]);
+			});
+			await writeChanges(tx, [
+				cropChange(image, createdCrop),
+				orientationChange(image, createdOrientation)
+			]);
+		});
+
+		notifyChanges();
+		invalidateCropped(filename);
 
 		return json({ success: true, imageId: image.id });
 	} catch (error) {
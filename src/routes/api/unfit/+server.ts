@@ -1,5 +1,6 @@
 import { json } from '@sveltejs/kit';
 import prisma from '$lib/server/db';
+import { notifyChanges, writeChanges } from '$lib/server/changes';
 import type { RequestHandler } from './$types';
 
 export const POST: RequestHandler = async ({ request }) => {
@@ -18,14 +19,26 @@ export const POST: RequestHandler = async ({ request }) => {
 			create: { filename, width, height }
 		});
 
-		// Create unfit marking
-		await prisma.unfit.create({
-			data: {
-				image_id: image.id,
-				user_id: userId
-			}
+		// Create unfit marking and its change event
+		await prisma.$transaction(async (tx) => {
+			const unfit = await tx.unfit.create({
+				data: {
+					image_id: image.id,
+					user_id: userId
+				}
+			});
+			await writeChanges(tx, [
+				{
+					type: 'unfit',
+					image_id: image.id,
+					filename: image.filename,
+					data: { unfit_id: unfit.id, user_id: unfit.user_id }
+				}
+			]);
 		});
 
+		notifyChanges();
+
 		return json({ success: true, imageId: image.id });
 	} catch (error) {
 		console.error('Database error:', error);
@@ -0,0 +1,69 @@
+import { json } from '@sveltejs/kit';
+import type { RequestHandler } from './$types';
+import { validateApiToken } from '$lib/server/auth';
+import { changeVersion, getChanges, getLatestCursor, waitForChanges } from '$lib/server/changes';
+
+const DEFAULT_LIMIT = 500;
+const MAX_LIMIT = 1000;
+const MAX_WAIT_SECONDS = 60;
+
+/**
+ * GET /api/v1/changes
+ * Long-poll feed of crop, orientation, unfit, rotation and delete events
+ * Query params:
+ *   - cursor: return events with id greater than this (default: 0, the start of the feed)
+ *   - limit: max events per response (default: 500, max: 1000; 0 returns only the latest cursor)
+ *   - wait: seconds to hold the request open when there is nothing new (default: 0, max: 60)
+ * Pass the returned cursor back on the next call to resume where the last batch ended.
+ */
+export const GET: RequestHandler = async (event) => {
+	const authError = validateApiToken(event);
+	if (authError) return authError;
+
+	const { url, request } = event;
+	const cursor = parseInt(url.searchParams.get('cursor') || '0');
+	const limit = parseInt(url.searchParams.get('limit') || String(DEFAULT_LIMIT));
+	const wait = parseFloat(url.searchParams.get('wait') || '0');
+
+	if (isNaN(cursor) || cursor < 0) {
+		return json({ error: 'cursor must be a non-negative integer' }, { status: 400 });
+	}
+
+	if (isNaN(limit) || limit < 0 || limit > MAX_LIMIT) {
+		return json({ error: `limit must be between 0 and ${MAX_LIMIT}` }, { status: 400 });
+	}
+
+	if (isNaN(wait) || wait < 0 || wait > MAX_WAIT_SECONDS) {
+		return json(
+			{ error: `wait must be between 0 and ${MAX_WAIT_SECONDS} seconds` },
+			{ status: 400 }
+		);
+	}
+
+	try {
+		// Lets a new consumer start from "now" after an initial full sync
+		if (limit === 0) {
+			return json({ events: [], cursor: await getLatestCursor(), has_more: false });
+		}
+
+		// Take the version before each query: a write that commits while the query
+		// runs bumps it, and the wait returns at once instead of sleeping through it
+		const deadline = Date.now() + wait * 1000;
+		let version = changeVersion();
+		let events = await getChanges(cursor, limit);
+		while (events.length === 0 && Date.now() < deadline && !request.signal.aborted) {
+			await waitForChanges(deadline - Date.now(), request.signal, version);
+			version = changeVersion();
+			events = await getChanges(cursor, limit);
+		}
+
+		return json({
+			events,
+			cursor: events.length > 0 ? events[events.length - 1].id : cursor,
+			has_more: events.length === limit
+		});
+	} catch (error) {
+		console.error('Database error:', error);
+		return json({ error: 'Failed to fetch changes' }, { status: 500 });
+	}
+};
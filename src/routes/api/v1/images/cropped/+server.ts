@@ -0,0 +1,85 @@
+import { json } from '@sveltejs/kit';
+import type { RequestHandler } from './$types';
+import { validateApiToken } from '$lib/server/auth';
+import { isSafeFilename, parseSize, renderCropped } from '$lib/server/cropped';
+import { tarEnd, tarEntry } from '$lib/server/tar';
+
+/**
+ * POST /api/v1/images/cropped
+ * Stream consensus-cropped JPEGs for many images as one tar archive
+ * Body: { filenames: string[], size?: number }
+ *
+ * Images are rendered one at a time while the response streams, so memory stays
+ * flat regardless of batch size. Images that are missing or have no consensus
+ * are listed in a trailing errors.json entry.
+ */
+export const POST: RequestHandler = async (event) => {
+	const authError = validateApiToken(event);
+	if (authError) return authError;
+
+	let body;
+	try {
+		body = await event.request.json();
+	} catch {
+		return json({ error: 'Invalid JSON body' }, { status: 400 });
+	}
+
+	const { filenames } = body;
+	if (!Array.isArray(filenames) || filenames.length === 0) {
+		return json({ error: 'filenames array required' }, { status: 400 });
+	}
+
+	const size = parseSize(body.size);
+	if (size === null) {
+		return json({ error: 'size must be between 16 and 4096' }, { status: 400 });
+	}
+
+	const queue = [...filenames];
+	const errors: { filename: string; error: string }[] = [];
+	let finished = false;
+
+	const stream = new ReadableStream<Uint8Array>({
+		async pull(controller) {
+			if (finished) return;
+
+			// Render the next image that succeeds, recording failures as we go
+			while (queue.length > 0) {
+				const filename = String(queue.shift());
+				if (!isSafeFilename(filename)) {
+					errors.push({ filename, error: 'Invalid filename' });
+					continue;
+				}
+				try {
+					const render = await renderCropped(filename, size);
+					if (!render) {
+						errors.push({ filename, error: 'No consensus crop for this image' });
+						continue;
+					}
+					const name = /\.jpe?g$/i.test(filename) ? filename : `${filename}.jpg`;
+					for (const chunk of tarEntry(name, render.buffer)) controller.enqueue(chunk);
+					return;
+				} catch (err) {
+					errors.push({
+						filename,
+						error: err instanceof Error ? err.message : 'Failed to render image'
+					});
+				}
+			}
+
+			if (errors.length > 0) {
+				const data = Buffer.from(JSON.stringify({ errors }, null, 2));
+				for (const chunk of tarEntry('errors.json', data)) controller.enqueue(chunk);
+			}
+			controller.enqueue(tarEnd());
+			controller.close();
+			finished = true;
+		}
+	});
+
+	return new Response(stream, {
+		headers: {
+			'Content-Type': 'application/x-tar',
+			'Content-Disposition': 'attachment; filename="cropped.tar"'
+		}
+	});
+};
@@ -0,0 +1,77 @@
+import type { RequestHandler } from './$types';
+import { error } from '@sveltejs/kit';
+import { validateApiToken } from '$lib/server/auth';
+import { isSafeFilename, parseSize, renderResolved, resolveCropped } from '$lib/server/cropped';
+
+/**
+ * A missing file is a 404; database and decode errors are server errors
+ */
+function renderError(err: unknown): never {
+	if ((err as NodeJS.ErrnoException)?.code === 'ENOENT') {
+		throw error(404, 'Image not found');
+	}
+	console.error('Error rendering cropped image:', err);
+	throw error(500, 'Failed to render cropped image');
+}
+
+/**
+ * GET /api/v1/images/cropped/[filename]
+ * Consensus-cropped JPEG rendered server-side (cached until the consensus changes)
+ * Query params:
+ *   - size: fit the crop inside size x size pixels (16-4096, default: full resolution)
+ */
+export const GET: RequestHandler = async (event) => {
+	const authError = validateApiToken(event);
+	if (authError) return authError;
+
+	const { filename } = event.params;
+
+	if (!filename) {
+		throw error(400, 'Filename required');
+	}
+
+	// Security: prevent directory traversal
+	if (!isSafeFilename(filename)) {
+		throw error(400, 'Invalid filename');
+	}
+
+	const size = parseSize(event.url.searchParams.get('size'));
+	if (size === null) {
+		throw error(400, 'size must be between 16 and 4096');
+	}
+
+	let source;
+	try {
+		source = await resolveCropped(filename, size);
+	} catch (err) {
+		renderError(err);
+	}
+
+	if (!source) {
+		throw error(404, 'No consensus crop for this image');
+	}
+
+	const headers = {
+		ETag: source.etag,
+		'Cache-Control': 'private, no-cache'
+	};
+
+	// Answer conditional requests before reading or decoding the image
+	if (event.request.headers.get('if-none-match') === source.etag) {
+		return new Response(null, { status: 304, headers });
+	}
+
+	let buffer;
+	try {
+		buffer = await renderResolved(source);
+	} catch (err) {
+		renderError(err);
+	}
+
+	return new Response(buffer as Buffer<ArrayBuffer>, {
+		headers: {
+			...headers,
+			'Content-Type': 'image/jpeg'
+		}
+	});
+};
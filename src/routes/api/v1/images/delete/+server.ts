@@ -2,6 +2,9 @@ import { json, error } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
 import { validateApiToken } from '$lib/server/auth';
 import prisma from '$lib/server/db';
+import { invalidateCropped } from '$lib/server/cropped';
+import { getPhashIndex, isValidPhash } from '$lib/server/phash';
+import { notifyChanges, writeChanges } from '$lib/server/changes';
 import fs from 'fs/promises';
 import path from 'path';
 
@@ -33,10 +36,40 @@ export const DELETE: RequestHandler = async (event) => {
 
 		// Delete the image and all related data (cascading)
 		// Prisma will handle deleting related crops, orientations, and unfits
-		await prisma.image.delete({
-			where: { id: image.id }
+		await prisma.$transaction(async (tx) => {
+			await tx.image.delete({
+				where: { id: image.id }
+			});
+			await writeChanges(tx, [
+				{ type: 'delete', image_id: image.id, filename, data: { target: 'image' } }
+			]);
 		});
 
+		notifyChanges();
+		invalidateCropped(filename);
+
+		// Promote the oldest near-duplicate grouped under this image to canonical and
+		// re-point the rest of the group to it, so only one of them returns to the queue
+		const phashIndex = await getPhashIndex();
+		phashIndex.remove(image.id);
+		const promoted = await prisma.image.findFirst({
+			where: { duplicate_of: image.id },
+			orderBy: { id: 'asc' },
+			select: { id: true, filename: true, phash: true }
+		});
+		if (promoted) {
+			await prisma.$transaction([
+				prisma.image.update({ where: { id: promoted.id }, data: { duplicate_of: null } }),
+				prisma.image.updateMany({
+					where: { duplicate_of: image.id },
+					data: { duplicate_of: promoted.id }
+				})
+			]);
+			if (isValidPhash(promoted.phash)) {
+				phashIndex.add(promoted.id, promoted.filename, promoted.phash);
+			}
+		}
+
 		// Try to delete the actual file from static/uploads
 		const uploadPath = path.join(process.cwd(), 'static', 'uploads', filename);
 		try {
@@ -2,6 +2,10 @@ import { json } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
 import { validateApiToken } from '$lib/server/auth';
 import prisma from '$lib/server/db';
+import { invalidateCropped } from '$lib/server/cropped';
+import { MAX_PHASH_DISTANCE, PHASH_DISTANCE, computePhash, getPhashIndex } from '$lib/server/phash';
+import { cropChange, notifyChanges, orientationChange, writeChanges } from '$lib/server/changes';
+import type { ChangeInput } from '$lib/server/changes';
 import { env } from '$env/dynamic/private';
 import { writeFile, mkdir } from 'fs/promises';
 import { join } from 'path';
@@ -31,7 +35,9 @@ interface BulkImageUpload {
  * POST /api/v1/images/upload-bulk
  * Upload multiple images with optional metadata in a single request
  * Body: {
- *   images: BulkImageUpload[]
+ *   images: BulkImageUpload[],
+ *   duplicateDistance?: number, // max Hamming distance for near-duplicates, -1 to 8 (default: PHASH_DISTANCE, -1 disables)
+ *   duplicateAction?: 'skip' | 'group' // skip near-duplicates, or store them grouped under the original (default: skip)
  * }
  */
 export const POST: RequestHandler = async (event) => {
@@ -39,12 +45,33 @@ export const POST: RequestHandler = async (event) => {
 	if (authError) return authError;
 
 	try {
-		const { images } = await event.request.json();
+		const {
+			images,
+			duplicateDistance = PHASH_DISTANCE,
+			duplicateAction = 'skip'
+		} = await event.request.json();
 
 		if (!Array.isArray(images) || images.length === 0) {
 			return json({ error: 'images array is required and must not be empty' }, { status: 400 });
 		}
 
+		if (
+			!Number.isInteger(duplicateDistance) ||
+			duplicateDistance < -1 ||
+			duplicateDistance > MAX_PHASH_DISTANCE
+		) {
+			return json(
+				{ error: `duplicateDistance must be an integer from -1 to ${MAX_PHASH_DISTANCE}` },
+				{ status: 400 }
+			);
+		}
+
+		if (!['skip', 'group'].includes(duplicateAction)) {
+			return json({ error: 'duplicateAction must be "skip" or "group"' }, { status: 400 });
+		}
+
+		const phashIndex = await getPhashIndex();
+
 		// No upper limit - handle any number of images
 		console.log(`Processing bulk upload of ${images.length} images`);
 
@@ -56,6 +83,7 @@ export const POST: RequestHandler = async (event) => {
 		const results = {
 			successful: [] as string[],
 			skipped: [] as string[],
+			duplicates: [] as { filename: string; duplicate_of: string; distance: number }[],
 			failed: [] as { filename: string; error: string }[]
 		};
 
@@ -116,53 +144,77 @@ export const POST: RequestHandler = async (event) => {
 						}
 					}
 
-					// Convert base64 to buffer and save
+					// Convert base64 to buffer
 					const imageBuffer = Buffer.from(imageData, 'base64');
+
+					// Near-duplicate check against every canonical image (new images only)
+					let phash: string | null = null;
+					let duplicateOf: number | null = null;
+					if (!existingImage) {
+						// Always hashed here: client hashes come from a different decoder and resampler
+						phash = await computePhash(imageBuffer).catch(() => null);
+						const match =
+							phash && duplicateDistance >= 0
+								? phashIndex.nearest(phash, duplicateDistance)
+								: null;
+						if (match) {
+							results.duplicates.push({
+								filename,
+								duplicate_of: match.filename,
+								distance: match.distance
+							});
+							if (duplicateAction === 'skip') continue;
+							duplicateOf = match.id;
+						}
+					}
+
 					await writeFile(filePath, imageBuffer);
 
 					// Upsert image in database
 					const image = await prisma.image.upsert({
 						where: { filename },
 						update: {},
-						create: { filename, width, height }
+						create: { filename, width, height, phash, duplicate_of: duplicateOf }
 					});
 
-					// Save crops and orientations in transaction if provided
+					if (phash && duplicateOf === null) {
+						phashIndex.add(image.id, filename, phash);
+					}
+
+					// Save crops, orientations and their change events in a transaction if provided
 					if ((crops && crops.length > 0) || (orientations && orientations.length > 0)) {
-						const operations = [];
-
-						if (crops) {
-							for (const crop of crops) {
-								operations.push(
-									prisma.crop.create({
-										data: {
-											image_id: image.id,
-											user_id: crop.user_id,
-											x: crop.x,
-											y: crop.y,
-											width: crop.width,
-											height: crop.height
-										}
-									})
-								);
+						await prisma.$transaction(async (tx) => {
+							const changes: ChangeInput[] = [];
+
+							for (const crop of crops ?? []) {
+								const created = await tx.crop.create({
+									data: {
+										image_id: image.id,
+										user_id: crop.user_id,
+										x: crop.x,
+										y: crop.y,
+										width: crop.width,
+										height: crop.height
+									}
+								});
+								changes.push(cropChange(image, created));
 							}
-						}
 
-						if (orientations) {
-							for (const orientation of orientations) {
-								operations.push(
-									prisma.orientation.create({
-										data: {
-											image_id: image.id,
-											user_id: orientation.user_id,
-											orientation: orientation.orientation
-										}
-									})
-								);
+							for (const orientation of orientations ?? []) {
+								const created = await tx.orientation.create({
+									data: {
+										image_id: image.id,
+										user_id: orientation.user_id,
+										orientation: orientation.orientation
+									}
+								});
+								changes.push(orientationChange(image, created));
 							}
-						}
 
-						await prisma.$transaction(operations);
+							await writeChanges(tx, changes);
+						});
+						notifyChanges();
+						invalidateCropped(filename);
 					}
 
 					results.successful.push(filename);
@@ -177,7 +229,7 @@ export const POST: RequestHandler = async (event) => {
 
 			// Log progress after each chunk
 			console.log(
-				`Chunk ${chunkIndex + 1} complete: ${results.successful.length} successful, ${results.skipped.length} skipped, ${results.failed.length} failed`
+				`Chunk ${chunkIndex + 1} complete: ${results.successful.length} successful, ${results.skipped.length} skipped, ${results.duplicates.length} near-duplicates, ${results.failed.length} failed`
 			);
 		}
 
@@ -189,6 +241,7 @@ export const POST: RequestHandler = async (event) => {
 				total: images.length,
 				successful: results.successful.length,
 				skipped: results.skipped.length,
+				duplicates: results.duplicates.length,
 				failed: results.failed.length,
 				results
 			},
@@ -2,6 +2,9 @@ import { json } from '@sveltejs/kit';
 import type { RequestHandler } from './$types';
 import { validateApiToken } from '$lib/server/auth';
 import prisma from '$lib/server/db';
+import { invalidateCropped } from '$lib/server/cropped';
+import { computePhash, getPhashIndex } from '$lib/server/phash';
+import { cropChange, notifyChanges, orientationChange, writeChanges } from '$lib/server/changes';
 import { env } from '$env/dynamic/private';
 import { writeFile, mkdir } from 'fs/promises';
 import { join } from 'path';
@@ -9,6 +12,25 @@ import { existsSync } from 'fs';
 
 const IMAGES_PATH = env.IMAGES_PATH || './static/images';
 
+/**
+ * Create the image record with its perceptual hash and add it to the
+ * near-duplicate index (single uploads are always stored, never skipped)
+ */
+async function upsertWithPhash(filename: string, width: number, height: number, buffer: Buffer) {
+	const phash = await computePhash(buffer).catch(() => null);
+	const image = await prisma.image.upsert({
+		where: { filename },
+		update: {},
+		create: { filename, width, height, phash }
+	});
+
+	if (image.phash && image.duplicate_of === null) {
+		(await getPhashIndex()).add(image.id, image.filename, image.phash);
+	}
+
+	return image;
+}
+
 /**
  * POST /api/v1/images/upload
  * Upload image with optional metadata
@@ -60,11 +82,7 @@ export const POST: RequestHandler = async (event) => {
 			await writeFile(filePath, imageBuffer);
 
 			// Upsert image in database
-			const image = await prisma.image.upsert({
-				where: { filename },
-				update: {},
-				create: { filename, width, height }
-			});
+			const image = await upsertWithPhash(filename, width, height, imageBuffer);
 
 			// If crop and orientation provided, save them
 			if (crop && orientation && userId) {
@@ -72,8 +90,8 @@ export const POST: RequestHandler = async (event) => {
 					return json({ error: 'Invalid orientation. Must be "side" or "front"' }, { status: 400 });
 				}
 
-				await prisma.$transaction([
-					prisma.crop.create({
+				await prisma.$transaction(async (tx) => {
+					const createdCrop = await tx.crop.create({
 						data: {
 							image_id: image.id,
 							user_id: userId,
@@ -82,17 +100,25 @@ export const POST: RequestHandler = async (event) => {
 							width: crop.width,
 							height: crop.height
 						}
-					}),
-					prisma.orientation.create({
+					});
+					const createdOrientation = await tx.orientation.create({
 						data: {
 							image_id: image.id,
 							user_id: userId,
 							orientation
 						}
-					})
-				]);
+					});
+					await writeChanges(tx, [
+						cropChange(image, createdCrop),
+						orientationChange(image, createdOrientation)
+					]);
+				});
+				notifyChanges();
 			}
 
+			// The file on disk may have been replaced
+			invalidateCropped(filename);
+
 			return json({
 				success: true,
 				imageId: image.id,
@@ -126,11 +152,7 @@ export const POST: RequestHandler = async (event) => {
 			await writeFile(filePath, buffer);
 
 			// Upsert image in database
-			const image = await prisma.image.upsert({
-				where: { filename },
-				update: {},
-				create: { filename, width, height }
-			});
+			const image = await upsertWithPhash(filename, width, height, buffer);
 
 			return json({
 				success: true,
@@ -0,0 +1,83 @@
+import { json } from '@sveltejs/kit';
+import type { RequestHandler } from './$types';
+import { validateApiToken } from '$lib/server/auth';
+import prisma from '$lib/server/db';
+
+interface CountsRow {
+	total_images: bigint | number;
+	images_with_crops: bigint | number;
+	images_with_orientations: bigint | number;
+	images_with_unfits: bigint | number;
+	total_crops: bigint | number;
+	total_orientations: bigint | number;
+	total_unfits: bigint | number;
+}
+
+interface ConsensusRow {
+	orientation: string;
+	images: bigint | number;
+}
+
+/**
+ * GET /api/v1/stats
+ * Returns dataset-wide counts computed with SQL aggregates (constant-size response)
+ */
+export const GET: RequestHandler = async (event) => {
+	const authError = validateApiToken(event);
+	if (authError) return authError;
+
+	try {
+		const [[counts], consensus] = await Promise.all([
+			prisma.$queryRaw<CountsRow[]>`
+				SELECT
+					(SELECT COUNT(*) FROM images) AS total_images,
+					(SELECT COUNT(DISTINCT image_id) FROM crops) AS images_with_crops,
+					(SELECT COUNT(DISTINCT image_id) FROM orientations) AS images_with_orientations,
+					(SELECT COUNT(DISTINCT image_id) FROM unfits) AS images_with_unfits,
+					(SELECT COUNT(*) FROM crops) AS total_crops,
+					(SELECT COUNT(*) FROM orientations) AS total_orientations,
+					(SELECT COUNT(*) FROM unfits) AS total_unfits
+			`,
+			// Most common orientation per image, then how many images have each consensus
+			prisma.$queryRaw<ConsensusRow[]>`
+				WITH votes AS (
+					SELECT
+						image_id,
+						orientation,
+						ROW_NUMBER() OVER (
+							PARTITION BY image_id ORDER BY COUNT(*) DESC, MIN(id) ASC
+						) AS rank
+					FROM orientations
+					GROUP BY image_id, orientation
+				)
+				SELECT orientation, COUNT(*) AS images
+				FROM votes
+				WHERE rank = 1
+				GROUP BY orientation
+			`
+		]);
+
+		const consensusOrientations: Record<string, number> = {};
+		for (const row of consensus) {
+			consensusOrientations[row.orientation] = Number(row.images);
+		}
+
+		const totalImages = Number(counts.total_images);
+		const classified = Object.values(consensusOrientations).reduce((a, b) => a + b, 0);
+
+		return json({
+			totalImages,
+			imagesWithCrops: Number(counts.images_with_crops),
+			imagesWithOrientations: Number(counts.images_with_orientations),
+			imagesWithUnfits: Number(counts.images_with_unfits),
+			totalSubmissions: Number(counts.total_crops),
+			totalOrientations: Number(counts.total_orientations),
+			totalUnfits: Number(counts.total_unfits),
+			consensusOrientations,
+			unclassified: totalImages - classified
+		});
+	} catch (error) {
+		console.error('Database error:', error);
+		return json({ error: 'Failed to fetch stats' }, { status: 500 });
+	}
+};
@@ -8,67 +8,37 @@ This script fetches data from the server to confirm:
 3. Orientation classifications are working
 """
 
+import os
 import sys
-import requests
-import json
 from typing import Optional
 
-def check_api_health(base_url: str, token: str) -> bool:
+from cropmymj import DEFAULT_BASE_URL, CropMyMJClient
+
+SAMPLE_SIZE = 50
+
+def check_api_health(client: CropMyMJClient) -> bool:
     """Check if API is accessible"""
     try:
-        response = requests.get(
-            f"{base_url}/api/v1/images/list",
-            headers={'Authorization': f'Bearer {token}'},
-            timeout=10
-        )
-        return response.status_code == 200
+        return client.request('GET', '/api/v1/stats', timeout=10).status_code == 200
     except Exception as e:
         print(f"❌ API not accessible: {e}")
         return False
 
-def get_image_list(base_url: str, token: str, include_data: bool = False) -> dict:
-    """Get list of all images"""
-    url = f"{base_url}/api/v1/images/list"
-    if include_data:
-        url += "?include_data=true"
-    
-    response = requests.get(
-        url,
-        headers={'Authorization': f'Bearer {token}'},
-        timeout=30
-    )
-    response.raise_for_status()
-    return response.json()
-
-def get_image_data(base_url: str, token: str, filename: str) -> dict:
-    """Get detailed data for a specific image"""
-    response = requests.get(
-        f"{base_url}/api/v1/images/data",
-        params={'filename': filename},
-        headers={'Authorization': f'Bearer {token}'},
-        timeout=10
-    )
-    response.raise_for_status()
-    return response.json()
-
-def get_consensus_data(base_url: str, filename: str) -> Optional[dict]:
+def get_consensus_data(client: CropMyMJClient, filename: str) -> Optional[dict]:
     """Get consensus data (public endpoint)"""
     try:
-        response = requests.get(
-            f"{base_url}/api/consensus",
-            params={'filename': filename},
-            timeout=10
-        )
+        response = client.get_consensus(filename)
         if response.status_code == 200:
             return response.json()
         return None
-    except:
+    except Exception:
         return None
 
 def main():
     # Configuration
-    BASE_URL = "http://localhost:5174"
-    TOKEN = "w-0er0wetv-rnti0ew-rit-0enwitc0-ewitre0w-rhi"
+    BASE_URL = DEFAULT_BASE_URL
+    TOKEN = os.environ.get('CROPMYMJ_TOKEN', "w-0er0wetv-rnti0ew-rit-0enwitc0-ewitre0w-rhi")
+    client = CropMyMJClient(BASE_URL, token=TOKEN)
     
     print("=" * 70)
     print("🔍 Image Upload & Classification Verification")
@@ -77,21 +47,21 @@ def main():
     
     # Check API health
     print("1️⃣  Checking API connectivity...")
-    if not check_api_health(BASE_URL, TOKEN):
+    if not check_api_health(client):
         print("❌ Cannot connect to API. Make sure server is running:")
         print("   cd /Users/hasenkap/Developer/pose/website && pnpm run dev")
         sys.exit(1)
     print("✅ API is accessible")
     print()
     
-    # Get image list
-    print("2️⃣  Fetching image list...")
+    # Get dataset counts
+    print("2️⃣  Fetching dataset statistics...")
     try:
-        data = get_image_list(BASE_URL, TOKEN)
-        total_images = data.get('total', 0)
+        stats = client.get_stats()
+        total_images = stats.get('totalImages', 0)
         print(f"✅ Found {total_images} images in database")
     except Exception as e:
-        print(f"❌ Failed to fetch image list: {e}")
+        print(f"❌ Failed to fetch statistics: {e}")
         sys.exit(1)
     print()
     
@@ -100,36 +70,35 @@ def main():
         print("   python3 ./website/bulk_upload.py ./set-unfiltered-uncropped --token w-0er0wetv-rnti0ew-rit-0enwitc0-ewitre0w-rhi --batch-size 50")
         sys.exit(0)
     
-    # Get detailed data with classifications
-    print("3️⃣  Fetching detailed image data with classifications...")
-    try:
-        detailed_data = get_image_list(BASE_URL, TOKEN, include_data=True)
-        images = detailed_data.get('images', [])
-        
-        # Count images with classifications
-        with_crops = sum(1 for img in images if img.get('crops') and len(img['crops']) > 0)
-        with_orientations = sum(1 for img in images if img.get('orientations') and len(img['orientations']) > 0)
-        with_consensus = sum(1 for img in images if img.get('consensusCrop') is not None)
-        
-        print(f"✅ Retrieved {len(images)} images with data")
-        print()
-        print("📊 Classification Statistics:")
-        print(f"   • Images with crop data: {with_crops}/{total_images} ({with_crops/total_images*100:.1f}%)")
-        print(f"   • Images with orientation data: {with_orientations}/{total_images} ({with_orientations/total_images*100:.1f}%)")
-        print(f"   • Images with consensus: {with_consensus}/{total_images} ({with_consensus/total_images*100:.1f}%)")
-        print()
-        
-    except Exception as e:
-        print(f"❌ Failed to fetch detailed data: {e}")
-        sys.exit(1)
+    # Classification counts come from SQL aggregates, no need to download every image
+    print("3️⃣  Classification statistics...")
+    with_crops = stats.get('imagesWithCrops', 0)
+    with_orientations = stats.get('imagesWithOrientations', 0)
+    # A consensus crop exists for every image with at least one crop
+    with_consensus = with_crops
+    
+    print("📊 Classification Statistics:")
+    print(f"   • Images with crop data: {with_crops}/{total_images} ({with_crops/total_images*100:.1f}%)")
+    print(f"   • Images with orientation data: {with_orientations}/{total_images} ({with_orientations/total_images*100:.1f}%)")
+    print(f"   • Images with consensus: {with_consensus}/{total_images} ({with_consensus/total_images*100:.1f}%)")
+    print()
     
     # Show sample data
-    print("4️⃣  Sample images with classifications:")
+    print(f"4️⃣  Sample images with classifications (first {SAMPLE_SIZE} images):")
     print()
     
+    try:
+        images = client.list_images(include_data=True, limit=SAMPLE_SIZE).get('images', [])
+    except Exception as e:
+        print(f"❌ Failed to fetch sample data: {e}")
+        sys.exit(1)
+    
     classified_images = [img for img in images if img.get('crops') and len(img['crops']) > 0]
     
-    if not classified_images:
+    if not classified_images and with_crops > 0:
+        print(f"ℹ️  None of the first {SAMPLE_SIZE} images are classified yet")
+        print()
+    elif not classified_images:
         print("⚠️  No classified images yet. To add classifications:")
         print("   1. Visit http://localhost:5174")
         print("   2. Login with password: ratemymj")
@@ -155,7 +124,7 @@ def main():
         test_image = images[0]['filename']
         print(f"5️⃣  Testing individual image fetch: {test_image}")
         try:
-            img_data = get_image_data(BASE_URL, TOKEN, test_image)
+            img_data = client.get_image_data(test_image)
             print(f"✅ Successfully fetched data for {test_image}")
             print(f"   • Crops: {len(img_data.get('crops', []))}")
             print(f"   • Orientations: {len(img_data.get('orientations', []))}")
@@ -168,7 +137,7 @@ def main():
     if classified_images:
         test_image = classified_images[0]['filename']
         print(f"6️⃣  Testing consensus endpoint: {test_image}")
-        consensus = get_consensus_data(BASE_URL, test_image)
+        consensus = get_consensus_data(client, test_image)
         if consensus:
             print(f"✅ Consensus data available")
             if consensus.get('consensus_crop'):